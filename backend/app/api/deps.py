@@ -13,7 +13,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency to get database session."""
+    """Dependency to get database session.
+
+    FastAPI caches dependencies per request, so get_current_user and the
+    endpoint share this one session (a single pool checkout per request).
+    """
     async with async_session() as session:
         try:
             yield session
@@ -77,7 +81,6 @@ async def get_user_subscription(
         subscription = Subscription(user_id=user_id, tier=SubscriptionTier.FREE)
         db.add(subscription)
         await db.commit()
-        await db.refresh(subscription)
 
     return subscription
 
@@ -90,7 +93,8 @@ async def check_paid_tier(
     if current_user.role == UserRole.ADMIN:
         return current_user
 
-    subscription = await get_user_subscription(db, current_user.id)
+    # Subscription is joined-loaded with the user; only query when it's missing
+    subscription = current_user.subscription or await get_user_subscription(db, current_user.id)
     if subscription.tier != SubscriptionTier.PAID:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -99,6 +103,9 @@ async def check_paid_tier(
     return current_user
 
 
+_FREE_TIER_LIMITS = TIER_LIMITS[SubscriptionTier.FREE]
+
+
 def get_tier_limit(tier: SubscriptionTier, feature: str):
     """Get the limit for a specific feature based on tier."""
-    return TIER_LIMITS.get(tier, TIER_LIMITS[SubscriptionTier.FREE]).get(feature)
+    return TIER_LIMITS.get(tier, _FREE_TIER_LIMITS).get(feature)
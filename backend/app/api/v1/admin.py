@@ -1,5 +1,4 @@
 from typing import List, Optional
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, func
@@ -9,7 +8,7 @@ from app.api.deps import get_db, get_current_admin_user
 from app.models.user import User, UserRead, UserRole
 from app.models.attendance import AttendanceLog
 from app.models.subscription import Subscription, SubscriptionTier
-from app.core.security import hash_password
+from app.core.security import hash_password_async
 
 router = APIRouter()
 
@@ -132,13 +131,12 @@ async def create_user(
 
     user = User(
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         full_name=user_data.full_name,
         role=user_data.role,
     )
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()  # Assigns user.id without a separate commit
 
     # Create subscription (free for regular users, admins don't need one but we create it anyway)
     subscription = Subscription(
@@ -184,10 +182,8 @@ async def update_user(
     for key, value in update_data.items():
         setattr(user, key, value)
 
-    user.updated_at = datetime.utcnow()
     db.add(user)
     await db.commit()
-    await db.refresh(user)
 
     return user
 
@@ -215,7 +211,6 @@ async def deactivate_user(
         )
 
     user.is_active = False
-    user.updated_at = datetime.utcnow()
     db.add(user)
     await db.commit()
 
@@ -244,7 +239,6 @@ async def override_subscription(
 
     if subscription:
         subscription.tier = tier
-        subscription.updated_at = datetime.utcnow()
     else:
         subscription = Subscription(user_id=user_id, tier=tier)
         db.add(subscription)
@@ -1,9 +1,10 @@
 from datetime import date, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, and_
-from pydantic import BaseModel
+from sqlmodel import select
+from pydantic import BaseModel, ConfigDict
 import calendar
 import httpx
 import tempfile
@@ -11,9 +12,12 @@ import os
 
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
-from app.models.attendance import AttendanceStatus, AttendanceSource, AttendanceLog, PublicHoliday
+from app.models.attendance import AttendanceStatus, AttendanceSource
 from app.models.feedback import ChatFeedback, FeedbackRating, ChatFeedbackCreate
 from app.services.ai_service import AIService
+from app.services.attendance_stats import count_statuses, status_total
+from app.services.holiday_calendar import count_weekday_holidays, get_holiday_dates
+from app.utils.dates import weekdays_between
 from app.config import settings
 
 router = APIRouter()
@@ -24,6 +28,8 @@ class NaturalLanguageRequest(BaseModel):
 
 
 class ParsedAttendanceEntry(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     date: date
     status: AttendanceStatus
     confidence: float = 1.0
@@ -36,6 +42,8 @@ class NaturalLanguageResponse(BaseModel):
 
 
 class Suggestion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     type: str  # reminder, recommendation, warning
     message: str
     priority: int  # 1-3, 1 being highest
@@ -165,17 +173,6 @@ async def get_suggestions(
         return SuggestionsResponse(suggestions=[])
 
 
-def count_weekdays(start_date: date, end_date: date) -> int:
-    """Count weekdays between two dates."""
-    count = 0
-    current = start_date
-    while current <= end_date:
-        if current.weekday() < 5:
-            count += 1
-        current += timedelta(days=1)
-    return count
-
-
 @router.get("/coaching", response_model=CoachingResponse)
 async def get_coaching(
     current_user: User = Depends(get_current_user),
@@ -193,47 +190,30 @@ async def get_coaching(
     month_start = today.replace(day=1)
     month_end = today.replace(day=calendar.monthrange(today.year, today.month)[1])
 
-    # Get attendance logs for this month
-    result = await db.execute(
-        select(AttendanceLog).where(
-            and_(
-                AttendanceLog.user_id == current_user.id,
-                AttendanceLog.date >= month_start,
-                AttendanceLog.date <= month_end,
-            )
-        )
-    )
-    logs = result.scalars().all()
-
-    # Get public holidays
-    holiday_result = await db.execute(
-        select(PublicHoliday).where(
-            and_(
-                PublicHoliday.date >= month_start,
-                PublicHoliday.date <= month_end,
-            )
-        )
-    )
-    holidays = {h.date for h in holiday_result.scalars().all()}
+    # Count this month's attendance by status (in SQL)
+    counts = await count_statuses(db, current_user.id, month_start, month_end, today)
+
+    # Public holidays (held in memory)
+    holidays = await get_holiday_dates(db)
 
     # Calculate stats - separate actual (past/today) from planned (future)
     # Actual office days = in_office on or before today
-    office_days = sum(1 for log in logs if log.status == AttendanceStatus.IN_OFFICE and log.date <= today)
+    office_days = counts[AttendanceStatus.IN_OFFICE, False]
     # Planned office days = in_office in the future
-    planned_office_days = sum(1 for log in logs if log.status == AttendanceStatus.IN_OFFICE and log.date > today)
+    planned_office_days = counts[AttendanceStatus.IN_OFFICE, True]
 
-    wfh_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH and log.date <= today)
-    leave_days = sum(1 for log in logs if log.status in [AttendanceStatus.ANNUAL_LEAVE, AttendanceStatus.SICK_LEAVE])
-    exempt_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH_EXEMPT)
+    wfh_days = counts[AttendanceStatus.WFH, False]
+    leave_days = status_total(counts, AttendanceStatus.ANNUAL_LEAVE) + status_total(counts, AttendanceStatus.SICK_LEAVE)
+    exempt_days = status_total(counts, AttendanceStatus.WFH_EXEMPT)
 
     # Count total business days for the month (weekdays - holidays)
-    total_weekdays = count_weekdays(month_start, month_end)
-    holiday_count = sum(1 for h in holidays if h.weekday() < 5)
+    total_weekdays = weekdays_between(month_start, month_end)
+    holiday_count = count_weekday_holidays(holidays, month_start, month_end)
     business_days = total_weekdays - holiday_count
 
     # Remaining business days (from tomorrow to end of month)
-    remaining_weekdays = count_weekdays(today + timedelta(days=1), month_end)
-    remaining_holidays = sum(1 for h in holidays if h > today and h.weekday() < 5)
+    remaining_weekdays = weekdays_between(today + timedelta(days=1), month_end)
+    remaining_holidays = count_weekday_holidays(holidays, today + timedelta(days=1), month_end)
     remaining_business_days = remaining_weekdays - remaining_holidays
 
     # Work days = business days minus leave and exempt days
@@ -260,7 +240,7 @@ async def get_coaching(
     can_meet_target = days_needed <= remaining_business_days
 
     # Determine status and generate coaching
-    first_name = current_user.full_name.split()[0] if current_user.full_name else "there"
+    first_name = current_user.full_name.split(None, 1)[0] if current_user.full_name else "there"
 
     stats = {
         "office_days": office_days,
@@ -345,66 +325,36 @@ async def get_coaching(
         )
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat_with_ai(
-    request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    """Chat with AI about your attendance, targets, or get help."""
-    if not request.message.strip():
-        return ChatResponse(
-            response="Please type a message to start chatting!",
-            suggestions=["How am I doing this month?", "What's my target?", "Tips for meeting my target"],
-        )
-
-    ai_service = AIService()
-
+async def _build_chat_context(current_user: User, db: AsyncSession) -> dict:
+    """This month's attendance numbers handed to the chat prompt."""
     # Get user's current stats for context
     today = date.today()
     month_start = today.replace(day=1)
     month_end = today.replace(day=calendar.monthrange(today.year, today.month)[1])
 
-    # Get attendance logs
-    result = await db.execute(
-        select(AttendanceLog).where(
-            and_(
-                AttendanceLog.user_id == current_user.id,
-                AttendanceLog.date >= month_start,
-                AttendanceLog.date <= month_end,
-            )
-        )
-    )
-    logs = result.scalars().all()
-
-    # Get public holidays
-    holiday_result = await db.execute(
-        select(PublicHoliday).where(
-            and_(
-                PublicHoliday.date >= month_start,
-                PublicHoliday.date <= month_end,
-            )
-        )
-    )
-    holidays = {h.date for h in holiday_result.scalars().all()}
+    # Count this month's attendance by status (in SQL)
+    counts = await count_statuses(db, current_user.id, month_start, month_end, today)
+
+    # Public holidays (held in memory)
+    holidays = await get_holiday_dates(db)
 
     # Calculate stats - separate actual (past/today) from planned (future)
-    office_days = sum(1 for log in logs if log.status == AttendanceStatus.IN_OFFICE and log.date <= today)
-    planned_office_days = sum(1 for log in logs if log.status == AttendanceStatus.IN_OFFICE and log.date > today)
-    wfh_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH and log.date <= today)
-    leave_days = sum(1 for log in logs if log.status in [AttendanceStatus.ANNUAL_LEAVE, AttendanceStatus.SICK_LEAVE])
-    exempt_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH_EXEMPT)
+    office_days = counts[AttendanceStatus.IN_OFFICE, False]
+    planned_office_days = counts[AttendanceStatus.IN_OFFICE, True]
+    wfh_days = counts[AttendanceStatus.WFH, False]
+    leave_days = status_total(counts, AttendanceStatus.ANNUAL_LEAVE) + status_total(counts, AttendanceStatus.SICK_LEAVE)
+    exempt_days = status_total(counts, AttendanceStatus.WFH_EXEMPT)
 
     # Calculate business days
-    total_weekdays = count_weekdays(month_start, month_end)
-    holiday_count = sum(1 for h in holidays if h.weekday() < 5)
+    total_weekdays = weekdays_between(month_start, month_end)
+    holiday_count = count_weekday_holidays(holidays, month_start, month_end)
     business_days = total_weekdays - holiday_count
 
     # Work days = business days minus leave and exempt
     work_days = business_days - leave_days - exempt_days
 
-    remaining_weekdays = count_weekdays(today + timedelta(days=1), month_end)
-    remaining_holidays = sum(1 for h in holidays if h > today and h.weekday() < 5)
+    remaining_weekdays = weekdays_between(today + timedelta(days=1), month_end)
+    remaining_holidays = count_weekday_holidays(holidays, today + timedelta(days=1), month_end)
     remaining_days = remaining_weekdays - remaining_holidays
 
     # Use work_days for percentage calculation (excludes leave/exempt)
@@ -419,7 +369,7 @@ async def chat_with_ai(
     # Projected percentage if all planned days are completed
     projected_pct = round(total_office_with_planned / work_days * 100) if work_days > 0 else 0
 
-    context = {
+    return {
         "user_name": current_user.full_name,
         "target_percentage": target_pct,
         "current_percentage": current_pct,
@@ -436,6 +386,23 @@ async def chat_with_ai(
         "target_office_days": target_office_days,
     }
 
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat_with_ai(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Chat with AI about your attendance, targets, or get help."""
+    if not request.message.strip():
+        return ChatResponse(
+            response="Please type a message to start chatting!",
+            suggestions=["How am I doing this month?", "What's my target?", "Tips for meeting my target"],
+        )
+
+    ai_service = AIService()
+    context = await _build_chat_context(current_user, db)
+
     try:
         response = await ai_service.chat(
             message=request.message,
@@ -452,6 +419,24 @@ async def chat_with_ai(
         )
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_ai(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Chat with AI, streaming the reply as plain text while it is generated."""
+    if not request.message.strip():
+        return StreamingResponse(iter(["Please type a message to start chatting!"]), media_type="text/plain")
+
+    ai_service = AIService()
+    context = await _build_chat_context(current_user, db)
+    return StreamingResponse(
+        ai_service.stream_chat(message=request.message, context=context),
+        media_type="text/plain",
+    )
+
+
 def _get_suggested_days(remaining_days: int, days_needed: int) -> str:
     """Generate suggested days to go to office."""
     if days_needed <= 0:
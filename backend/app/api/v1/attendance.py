@@ -1,12 +1,13 @@
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from typing import List, Optional
 import random
 # Force reload
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, and_, delete
+from sqlmodel import select, and_, delete, func
 
 from app.api.deps import get_db, get_current_user
+from app.database import upsert_insert
 from app.models.user import User
 from app.models.attendance import (
     AttendanceLog,
@@ -15,8 +16,10 @@ from app.models.attendance import (
     AttendanceLogUpdate,
     AttendanceStatus,
     AttendanceSummary,
-    PublicHoliday,
 )
+from app.services.attendance_stats import count_statuses, status_total
+from app.services.holiday_calendar import count_weekday_holidays, get_holiday_dates
+from app.utils.dates import date_range_filter, utc_now, weekdays_between
 
 router = APIRouter()
 
@@ -33,17 +36,6 @@ def get_financial_year_start(reference_date: date) -> date:
         return date(reference_date.year - 1, 10, 1)
 
 
-def count_weekdays(start_date: date, end_date: date) -> int:
-    """Count weekdays (Mon-Fri) between two dates inclusive."""
-    count = 0
-    current = start_date
-    while current <= end_date:
-        if current.weekday() < 5:  # Monday = 0, Friday = 4
-            count += 1
-        current += timedelta(days=1)
-    return count
-
-
 async def count_business_days(
     start_date: date, end_date: date, db: AsyncSession
 ) -> tuple[int, int]:
@@ -51,21 +43,11 @@ async def count_business_days(
 
     Returns: (business_days, public_holiday_count)
     """
-    weekdays = count_weekdays(start_date, end_date)
-
-    # Get public holidays in the period
-    result = await db.execute(
-        select(PublicHoliday).where(
-            and_(
-                PublicHoliday.date >= start_date,
-                PublicHoliday.date <= end_date,
-            )
-        )
-    )
-    holidays = result.scalars().all()
+    weekdays = weekdays_between(start_date, end_date)
 
     # Only count holidays that fall on weekdays
-    holiday_count = sum(1 for h in holidays if h.date.weekday() < 5)
+    holidays = await get_holiday_dates(db)
+    holiday_count = count_weekday_holidays(holidays, start_date, end_date)
 
     return weekdays - holiday_count, holiday_count
 
@@ -83,7 +65,7 @@ async def list_attendance(
     if start_date:
         query = query.where(AttendanceLog.date >= start_date)
     if end_date:
-        query = query.where(AttendanceLog.date <= end_date)
+        query = query.where(AttendanceLog.date < end_date + timedelta(days=1))
 
     query = query.order_by(AttendanceLog.date.desc())
     result = await db.execute(query)
@@ -120,7 +102,6 @@ async def create_attendance(
     )
     db.add(log)
     await db.commit()
-    await db.refresh(log)
 
     return log
 
@@ -283,10 +264,8 @@ async def update_attendance(
     for key, value in update_data.items():
         setattr(log, key, value)
 
-    log.updated_at = datetime.utcnow()
     db.add(log)
     await db.commit()
-    await db.refresh(log)
 
     return log
 
@@ -333,40 +312,29 @@ async def get_attendance_summary(
     - Each month is independent - no carryover
     - Weekends are excluded from all calculations
     """
-    # Get attendance logs
-    result = await db.execute(
-        select(AttendanceLog).where(
-            and_(
-                AttendanceLog.user_id == current_user.id,
-                AttendanceLog.date >= start_date,
-                AttendanceLog.date <= end_date,
-            )
-        )
-    )
-    logs = result.scalars().all()
-
-    # Count by status - office days in the future are automatically "planned"
+    # Count by status in SQL - office days in the future are automatically "planned"
     today = date.today()
+    counts = await count_statuses(db, current_user.id, start_date, end_date, today)
 
     # Actual office days = in_office on or before today
-    office_days = sum(1 for log in logs if log.status == AttendanceStatus.IN_OFFICE and log.date <= today)
+    office_days = counts[AttendanceStatus.IN_OFFICE, False]
 
     # Planned office days = in_office in the future OR explicitly planned_office
-    planned_office_days = sum(1 for log in logs if
-        (log.status == AttendanceStatus.IN_OFFICE and log.date > today) or
-        log.status == AttendanceStatus.PLANNED_OFFICE
+    planned_office_days = (
+        counts[AttendanceStatus.IN_OFFICE, True]
+        + status_total(counts, AttendanceStatus.PLANNED_OFFICE)
     )
 
     # WFH counts
-    wfh_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH and log.date <= today)
-    planned_wfh_days = sum(1 for log in logs if
-        (log.status == AttendanceStatus.WFH and log.date > today) or
-        log.status == AttendanceStatus.PLANNED_WFH
+    wfh_days = counts[AttendanceStatus.WFH, False]
+    planned_wfh_days = (
+        counts[AttendanceStatus.WFH, True]
+        + status_total(counts, AttendanceStatus.PLANNED_WFH)
     )
 
-    exempt_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH_EXEMPT)
-    annual_leave = sum(1 for log in logs if log.status == AttendanceStatus.ANNUAL_LEAVE)
-    sick_leave = sum(1 for log in logs if log.status == AttendanceStatus.SICK_LEAVE)
+    exempt_days = status_total(counts, AttendanceStatus.WFH_EXEMPT)
+    annual_leave = status_total(counts, AttendanceStatus.ANNUAL_LEAVE)
+    sick_leave = status_total(counts, AttendanceStatus.SICK_LEAVE)
 
     # Calculate business days (weekdays - public holidays)
     business_days, _ = await count_business_days(start_date, end_date, db)
@@ -421,8 +389,7 @@ async def get_calendar_view(
         select(AttendanceLog).where(
             and_(
                 AttendanceLog.user_id == current_user.id,
-                AttendanceLog.date >= start_date,
-                AttendanceLog.date <= end_date,
+                *date_range_filter(AttendanceLog.date, start_date, end_date),
             )
         ).order_by(AttendanceLog.date)
     )
@@ -470,24 +437,13 @@ async def get_monthly_history(
             else:
                 month_end = date(year, month + 1, 1) - timedelta(days=1)
 
-        # Get logs for this month
-        result = await db.execute(
-            select(AttendanceLog).where(
-                and_(
-                    AttendanceLog.user_id == current_user.id,
-                    AttendanceLog.date >= month_start,
-                    AttendanceLog.date <= month_end,
-                )
-            )
-        )
-        logs = result.scalars().all()
-
-        # Count by status
-        office_days = sum(1 for log in logs if log.status == AttendanceStatus.IN_OFFICE and log.date <= today)
-        wfh_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH and log.date <= today)
-        exempt_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH_EXEMPT)
-        annual_leave = sum(1 for log in logs if log.status == AttendanceStatus.ANNUAL_LEAVE)
-        sick_leave = sum(1 for log in logs if log.status == AttendanceStatus.SICK_LEAVE)
+        # Count by status for this month
+        counts = await count_statuses(db, current_user.id, month_start, month_end, today)
+        office_days = counts[AttendanceStatus.IN_OFFICE, False]
+        wfh_days = counts[AttendanceStatus.WFH, False]
+        exempt_days = status_total(counts, AttendanceStatus.WFH_EXEMPT)
+        annual_leave = status_total(counts, AttendanceStatus.ANNUAL_LEAVE)
+        sick_leave = status_total(counts, AttendanceStatus.SICK_LEAVE)
         leave_days = annual_leave + sick_leave
 
         # Calculate business days
@@ -573,10 +529,8 @@ async def quick_log(
     if existing:
         # Update existing
         existing.status = status
-        existing.updated_at = datetime.utcnow()
         db.add(existing)
         await db.commit()
-        await db.refresh(existing)
         return existing
     else:
         # Create new
@@ -587,5 +541,43 @@ async def quick_log(
         )
         db.add(log)
         await db.commit()
-        await db.refresh(log)
         return log
+
+
+@router.post("/bulk", response_model=List[AttendanceLogRead])
+async def bulk_log(
+    entries: List[AttendanceLogCreate],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Log several days at once, updating days that are already logged.
+
+    Used to save confirmed natural-language entries. Everything goes out as a
+    single INSERT ... ON CONFLICT (user_id, date) DO UPDATE ... RETURNING, so
+    there is one round-trip and no check-then-insert race.
+    """
+    # Last entry wins if the same date appears twice - one statement can't
+    # upsert the same row twice
+    by_date = {entry.date: entry for entry in entries}
+    if not by_date:
+        return []
+
+    stmt = upsert_insert(AttendanceLog).values(
+        [{**entry.model_dump(), "user_id": current_user.id} for entry in by_date.values()]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "date"],
+        set_={
+            "status": stmt.excluded.status,
+            # Keep existing notes unless new ones were sent
+            "notes": func.coalesce(stmt.excluded.notes, AttendanceLog.notes),
+            # Column onupdate isn't applied to ON CONFLICT updates
+            "updated_at": utc_now(),
+        },
+    ).returning(AttendanceLog)
+
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    logs = sorted(result.all(), key=lambda log: log.date)
+    await db.commit()
+
+    return logs
@@ -7,8 +7,9 @@ from pydantic import BaseModel, EmailStr
 
 from app.api.deps import get_db, get_current_user
 from app.core.security import (
-    verify_password,
     hash_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_refresh_token,
@@ -21,6 +22,10 @@ from app.config import settings
 
 router = APIRouter()
 
+# Verified against when the login email is unknown, so every attempt pays the
+# same hashing cost and missing accounts can't be probed cheaply
+_DUMMY_PASSWORD_HASH = hash_password("not-a-real-password")
+
 
 class Token(BaseModel):
     access_token: str
@@ -69,13 +74,12 @@ async def register(
     # Create user
     user = User(
         email=request.email,
-        hashed_password=hash_password(request.password),
+        hashed_password=await hash_password_async(request.password),
         full_name=request.full_name,
         role=UserRole.USER,
     )
     db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()  # Assigns user.id without a separate commit
 
     # Create free subscription
     subscription = Subscription(user_id=user.id, tier=SubscriptionTier.FREE)
@@ -94,7 +98,10 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    stored_hash = user.hashed_password if user else _DUMMY_PASSWORD_HASH
+    password_ok = await verify_password_async(form_data.password, stored_hash)
+
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -155,13 +162,13 @@ async def change_password(
     db: AsyncSession = Depends(get_db),
 ):
     """Change current user's password."""
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
-    current_user.hashed_password = hash_password(password_data.new_password)
+    current_user.hashed_password = await hash_password_async(password_data.new_password)
     db.add(current_user)
     await db.commit()
 
@@ -243,7 +250,7 @@ async def reset_password(
         )
 
     # Update password
-    user.hashed_password = hash_password(request.new_password)
+    user.hashed_password = await hash_password_async(request.new_password)
     db.add(user)
 
     # Mark token as used
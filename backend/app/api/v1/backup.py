@@ -1,12 +1,11 @@
 """Backup API endpoints for data export and database backup."""
-import json
 from datetime import datetime
 from typing import Optional
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Header
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-import io
 
 from app.config import settings
 from app.models.user import User
@@ -17,20 +16,58 @@ from app.api.deps import get_db, get_current_user
 router = APIRouter()
 
 
-def serialize_for_json(obj):
-    """Convert objects to JSON-serializable format."""
-    if hasattr(obj, 'model_dump'):
-        data = obj.model_dump()
-    elif hasattr(obj, '__dict__'):
-        data = {k: v for k, v in obj.__dict__.items() if not k.startswith('_')}
-    else:
-        return str(obj)
-
-    # Convert datetime and date objects
-    for key, value in data.items():
-        if hasattr(value, 'isoformat'):
-            data[key] = value.isoformat()
-    return data
+# Exported columns - plain row tuples skip ORM instance construction entirely
+ATTENDANCE_EXPORT_COLUMNS = (
+    AttendanceLog.id,
+    AttendanceLog.user_id,
+    AttendanceLog.date,
+    AttendanceLog.status,
+    AttendanceLog.source,
+    AttendanceLog.notes,
+    AttendanceLog.created_at,
+    AttendanceLog.updated_at,
+)
+TARGET_EXPORT_COLUMNS = (
+    Target.id,
+    Target.user_id,
+    Target.period_type,
+    Target.period_start,
+    Target.period_end,
+    Target.office_percentage,
+    Target.is_active,
+    Target.created_at,
+)
+HOLIDAY_EXPORT_COLUMNS = (
+    PublicHoliday.id,
+    PublicHoliday.date,
+    PublicHoliday.name,
+    PublicHoliday.region,
+)
+USER_EXPORT_COLUMNS = (  # Password hashes are never exported
+    User.id,
+    User.email,
+    User.full_name,
+    User.role,
+    User.is_active,
+    User.target_percentage,
+    User.created_at,
+    User.updated_at,
+)
+
+
+async def fetch_export_rows(db: AsyncSession, query) -> list[dict]:
+    """Stream a column-projected query and return its rows as plain dicts."""
+    result = await db.stream(query)
+    return [dict(row) async for row in result.mappings()]
+
+
+def json_attachment(export_data: dict, filename: str) -> Response:
+    """Render export data as a downloadable JSON file."""
+    return Response(
+        content=orjson.dumps(export_data, option=orjson.OPT_INDENT_2),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/export")
@@ -43,26 +80,25 @@ async def export_user_data(
     This can be used for personal backups or data portability.
     """
     # Get user's attendance logs
-    attendance_result = await db.execute(
-        select(AttendanceLog)
+    attendance_logs = await fetch_export_rows(
+        db,
+        select(*ATTENDANCE_EXPORT_COLUMNS)
         .where(AttendanceLog.user_id == current_user.id)
         .order_by(AttendanceLog.date)
     )
-    attendance_logs = attendance_result.scalars().all()
 
     # Get user's targets
-    targets_result = await db.execute(
-        select(Target)
+    targets = await fetch_export_rows(
+        db,
+        select(*TARGET_EXPORT_COLUMNS)
         .where(Target.user_id == current_user.id)
-        .order_by(Target.start_date)
+        .order_by(Target.period_start)
     )
-    targets = targets_result.scalars().all()
 
     # Get public holidays (shared data)
-    holidays_result = await db.execute(
-        select(PublicHoliday).order_by(PublicHoliday.date)
+    holidays = await fetch_export_rows(
+        db, select(*HOLIDAY_EXPORT_COLUMNS).order_by(PublicHoliday.date)
     )
-    holidays = holidays_result.scalars().all()
 
     # Build export data
     export_data = {
@@ -73,24 +109,17 @@ async def export_user_data(
             "target_percentage": current_user.target_percentage,
             "created_at": current_user.created_at.isoformat(),
         },
-        "attendance_logs": [serialize_for_json(log) for log in attendance_logs],
-        "targets": [serialize_for_json(target) for target in targets],
-        "public_holidays": [serialize_for_json(holiday) for holiday in holidays],
+        "attendance_logs": attendance_logs,
+        "targets": targets,
+        "public_holidays": holidays,
         "statistics": {
             "total_attendance_records": len(attendance_logs),
             "total_targets": len(targets),
         }
     }
 
-    # Create JSON file response
-    json_str = json.dumps(export_data, indent=2, default=str)
     filename = f"attendance_backup_{current_user.email}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-
-    return StreamingResponse(
-        io.BytesIO(json_str.encode('utf-8')),
-        media_type="application/json",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    return json_attachment(export_data, filename)
 
 
 @router.get("/export/full")
@@ -115,47 +144,31 @@ async def export_full_database(
         raise HTTPException(status_code=403, detail="Invalid backup secret")
 
     # Get all users (without passwords)
-    users_result = await db.execute(select(User))
-    users = users_result.scalars().all()
+    users = await fetch_export_rows(db, select(*USER_EXPORT_COLUMNS))
 
     # Get all attendance logs
-    attendance_result = await db.execute(
-        select(AttendanceLog).order_by(AttendanceLog.date)
+    attendance_logs = await fetch_export_rows(
+        db, select(*ATTENDANCE_EXPORT_COLUMNS).order_by(AttendanceLog.date)
     )
-    attendance_logs = attendance_result.scalars().all()
 
     # Get all targets
-    targets_result = await db.execute(
-        select(Target).order_by(Target.start_date)
+    targets = await fetch_export_rows(
+        db, select(*TARGET_EXPORT_COLUMNS).order_by(Target.period_start)
     )
-    targets = targets_result.scalars().all()
 
     # Get public holidays
-    holidays_result = await db.execute(
-        select(PublicHoliday).order_by(PublicHoliday.date)
+    holidays = await fetch_export_rows(
+        db, select(*HOLIDAY_EXPORT_COLUMNS).order_by(PublicHoliday.date)
     )
-    holidays = holidays_result.scalars().all()
 
     # Build full export (exclude password hashes)
     export_data = {
         "export_date": datetime.utcnow().isoformat(),
         "backup_type": "full",
-        "users": [
-            {
-                "id": u.id,
-                "email": u.email,
-                "full_name": u.full_name,
-                "role": u.role.value if hasattr(u.role, 'value') else u.role,
-                "is_active": u.is_active,
-                "target_percentage": u.target_percentage,
-                "created_at": u.created_at.isoformat(),
-                "updated_at": u.updated_at.isoformat(),
-            }
-            for u in users
-        ],
-        "attendance_logs": [serialize_for_json(log) for log in attendance_logs],
-        "targets": [serialize_for_json(target) for target in targets],
-        "public_holidays": [serialize_for_json(holiday) for holiday in holidays],
+        "users": users,
+        "attendance_logs": attendance_logs,
+        "targets": targets,
+        "public_holidays": holidays,
         "statistics": {
             "total_users": len(users),
             "total_attendance_records": len(attendance_logs),
@@ -164,11 +177,5 @@ async def export_full_database(
         }
     }
 
-    json_str = json.dumps(export_data, indent=2, default=str)
     filename = f"attendance_full_backup_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-
-    return StreamingResponse(
-        io.BytesIO(json_str.encode('utf-8')),
-        media_type="application/json",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    return json_attachment(export_data, filename)
@@ -1,16 +1,36 @@
+import time
 from datetime import date
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, and_
+from sqlmodel import select
 from pydantic import BaseModel
 
 from app.api.deps import get_db, get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.attendance import PublicHoliday
+from app.services.holiday_calendar import invalidate_holiday_dates
+from app.utils.dates import date_range_filter
 
 router = APIRouter()
 
+# Victorian FY26 public holidays (July 2025 - June 2026)
+_VIC_FY26_HOLIDAYS: tuple[tuple[date, str], ...] = (
+    (date(2025, 10, 3), "Friday before AFL Grand Final"),
+    (date(2025, 11, 4), "Melbourne Cup Day"),
+    (date(2025, 12, 25), "Christmas Day"),
+    (date(2025, 12, 26), "Boxing Day"),
+    (date(2026, 1, 1), "New Year's Day"),
+    (date(2026, 1, 26), "Australia Day"),
+    (date(2026, 3, 9), "Labour Day"),
+    (date(2026, 4, 3), "Good Friday"),
+    (date(2026, 4, 4), "Saturday before Easter Sunday"),
+    (date(2026, 4, 5), "Easter Sunday"),
+    (date(2026, 4, 6), "Easter Monday"),
+    (date(2026, 4, 25), "Anzac Day"),
+    (date(2026, 6, 8), "Queen's Birthday"),
+)
+
 
 class HolidayCreate(BaseModel):
     date: date
@@ -25,6 +45,20 @@ class HolidayRead(BaseModel):
     region: str
 
 
+# Read-through cache for list_holidays keyed by (region, year). Holidays change a
+# few times a year, so entries expire after a TTL (other workers' writes) and the
+# write endpoints below clear the cache outright.
+_HOLIDAY_CACHE_TTL_SECONDS = 300
+_HOLIDAY_CACHE_MAX_ENTRIES = 64
+_holiday_cache: dict[tuple[str, Optional[int]], tuple[float, List[HolidayRead]]] = {}
+
+
+def _invalidate_holiday_cache() -> None:
+    """Drop cached holiday lists and dates after a write."""
+    _holiday_cache.clear()
+    invalidate_holiday_dates()
+
+
 @router.get("", response_model=List[HolidayRead])
 async def list_holidays(
     year: Optional[int] = Query(None),
@@ -33,21 +67,26 @@ async def list_holidays(
     db: AsyncSession = Depends(get_db),
 ):
     """List public holidays, optionally filtered by year."""
+    cache_key = (region, year)
+    cached = _holiday_cache.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
     query = select(PublicHoliday).where(PublicHoliday.region == region)
 
     if year:
         start = date(year, 1, 1)
         end = date(year, 12, 31)
-        query = query.where(
-            and_(
-                PublicHoliday.date >= start,
-                PublicHoliday.date <= end,
-            )
-        )
+        query = query.where(*date_range_filter(PublicHoliday.date, start, end))
 
     query = query.order_by(PublicHoliday.date)
     result = await db.execute(query)
-    return result.scalars().all()
+    holidays = [HolidayRead.model_validate(h, from_attributes=True) for h in result.scalars().all()]
+
+    if len(_holiday_cache) >= _HOLIDAY_CACHE_MAX_ENTRIES:
+        _holiday_cache.clear()
+    _holiday_cache[cache_key] = (time.monotonic() + _HOLIDAY_CACHE_TTL_SECONDS, holidays)
+    return holidays
 
 
 @router.post("", response_model=HolidayRead, status_code=status.HTTP_201_CREATED)
@@ -70,7 +109,7 @@ async def create_holiday(
     db_holiday = PublicHoliday(**holiday.model_dump())
     db.add(db_holiday)
     await db.commit()
-    await db.refresh(db_holiday)
+    _invalidate_holiday_cache()
     return db_holiday
 
 
@@ -94,6 +133,7 @@ async def delete_holiday(
 
     await db.delete(holiday)
     await db.commit()
+    _invalidate_holiday_cache()
 
 
 @router.post("/seed-vic-fy26", status_code=status.HTTP_201_CREATED)
@@ -102,33 +142,21 @@ async def seed_vic_fy26_holidays(
     db: AsyncSession = Depends(get_db),
 ):
     """Seed Victorian FY26 public holidays (July 2025 - June 2026)."""
-    vic_holidays = [
-        # FY26: July 2025 - June 2026
-        (date(2025, 10, 3), "Friday before AFL Grand Final"),
-        (date(2025, 11, 4), "Melbourne Cup Day"),
-        (date(2025, 12, 25), "Christmas Day"),
-        (date(2025, 12, 26), "Boxing Day"),
-        (date(2026, 1, 1), "New Year's Day"),
-        (date(2026, 1, 26), "Australia Day"),
-        (date(2026, 3, 9), "Labour Day"),
-        (date(2026, 4, 3), "Good Friday"),
-        (date(2026, 4, 4), "Saturday before Easter Sunday"),
-        (date(2026, 4, 5), "Easter Sunday"),
-        (date(2026, 4, 6), "Easter Monday"),
-        (date(2026, 4, 25), "Anzac Day"),
-        (date(2026, 6, 8), "Queen's Birthday"),
-    ]
-
-    added = 0
-    for holiday_date, name in vic_holidays:
-        # Check if already exists
-        result = await db.execute(
-            select(PublicHoliday).where(PublicHoliday.date == holiday_date)
+    # Check which dates already exist in one query
+    result = await db.execute(
+        select(PublicHoliday.date).where(
+            PublicHoliday.date.in_([holiday_date for holiday_date, _ in _VIC_FY26_HOLIDAYS])
         )
-        if not result.scalar_one_or_none():
-            holiday = PublicHoliday(date=holiday_date, name=name, region="VIC")
-            db.add(holiday)
-            added += 1
+    )
+    existing = set(result.scalars().all())
+
+    new_holidays = [
+        PublicHoliday(date=holiday_date, name=name, region="VIC")
+        for holiday_date, name in _VIC_FY26_HOLIDAYS
+        if holiday_date not in existing
+    ]
+    db.add_all(new_holidays)
 
     await db.commit()
-    return {"message": f"Added {added} holidays", "total": len(vic_holidays)}
+    _invalidate_holiday_cache()
+    return {"message": f"Added {len(new_holidays)} holidays", "total": len(_VIC_FY26_HOLIDAYS)}
@@ -7,29 +7,13 @@ from sqlmodel import select, and_
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.target import Target, TargetCreate, TargetRead, TargetUpdate, TargetProgress
-from app.models.attendance import AttendanceLog, AttendanceStatus
+from app.models.attendance import AttendanceStatus
+from app.services.attendance_stats import count_statuses, status_total
+from app.utils.dates import weekdays_between
 
 router = APIRouter()
 
 
-def count_workdays(start_date: date, end_date: date) -> int:
-    """Count workdays (Mon-Fri) between two dates inclusive."""
-    count = 0
-    current = start_date
-    while current <= end_date:
-        if current.weekday() < 5:
-            count += 1
-        current += timedelta(days=1)
-    return count
-
-
-def count_remaining_workdays(from_date: date, end_date: date) -> int:
-    """Count remaining workdays from a date to end date."""
-    if from_date > end_date:
-        return 0
-    return count_workdays(from_date, end_date)
-
-
 @router.get("", response_model=List[TargetRead])
 async def list_targets(
     current_user: User = Depends(get_current_user),
@@ -77,7 +61,6 @@ async def create_target(
     )
     db.add(new_target)
     await db.commit()
-    await db.refresh(new_target)
 
     return new_target
 
@@ -130,33 +113,22 @@ async def get_target_progress(
             detail="No active target found",
         )
 
-    # Get attendance logs for target period
-    result = await db.execute(
-        select(AttendanceLog).where(
-            and_(
-                AttendanceLog.user_id == current_user.id,
-                AttendanceLog.date >= target.period_start,
-                AttendanceLog.date <= target.period_end,
-            )
-        )
-    )
-    logs = result.scalars().all()
-
-    # Calculate stats
-    in_office_days = sum(1 for log in logs if log.status == AttendanceStatus.IN_OFFICE)
-    wfh_days = sum(1 for log in logs if log.status == AttendanceStatus.WFH)
+    # Count attendance for target period
+    counts = await count_statuses(db, current_user.id, target.period_start, target.period_end)
+    in_office_days = status_total(counts, AttendanceStatus.IN_OFFICE)
+    wfh_days = status_total(counts, AttendanceStatus.WFH)
     logged_workdays = in_office_days + wfh_days
 
     today = date.today()
     effective_end = min(target.period_end, today)
-    total_workdays = count_workdays(target.period_start, effective_end)
-    days_remaining = count_remaining_workdays(today + timedelta(days=1), target.period_end)
+    total_workdays = weekdays_between(target.period_start, effective_end)
+    days_remaining = weekdays_between(today + timedelta(days=1), target.period_end)
 
     # Current percentage
     current_percentage = (in_office_days / logged_workdays * 100) if logged_workdays > 0 else 0
 
     # Calculate days needed to meet target
-    total_period_workdays = count_workdays(target.period_start, target.period_end)
+    total_period_workdays = weekdays_between(target.period_start, target.period_end)
     target_office_days = int(total_period_workdays * target.office_percentage / 100)
     days_needed = max(0, target_office_days - in_office_days)
 
@@ -213,7 +185,6 @@ async def update_target(
 
     db.add(target)
     await db.commit()
-    await db.refresh(target)
 
     return target
 
@@ -53,7 +53,6 @@ async def update_profile(
 
     db.add(current_user)
     await db.commit()
-    await db.refresh(current_user)
 
     return current_user
 
@@ -67,5 +66,4 @@ async def mark_intro_seen(
     current_user.has_seen_intro = True
     db.add(current_user)
     await db.commit()
-    await db.refresh(current_user)
     return current_user
@@ -11,6 +11,12 @@ class Settings(BaseSettings):
 
     # Database (SQLite for local dev, PostgreSQL for production)
     DATABASE_URL: str = "sqlite+aiosqlite:///./attendance.db"
+    DB_ECHO: bool = False  # Log every SQL statement (noisy; separate from DEBUG)
+
+    # Connection pool (PostgreSQL only - SQLite uses the driver's default pool)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a pooled connection is replaced
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -1,3 +1,6 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
@@ -19,6 +22,39 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# Argon2 is CPU and memory heavy, so request handlers hash in dedicated worker
+# processes instead of on the event loop. Started/stopped by the app lifespan;
+# falls back to the default thread executor when not running.
+_kdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def start_kdf_pool() -> None:
+    """Start the password hashing process pool (one worker per CPU)."""
+    global _kdf_pool
+    if _kdf_pool is None:
+        _kdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+def shutdown_kdf_pool() -> None:
+    """Stop the password hashing process pool."""
+    global _kdf_pool
+    if _kdf_pool is not None:
+        _kdf_pool.shutdown(cancel_futures=True)
+        _kdf_pool = None
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash in the hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_kdf_pool, verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_kdf_pool, hash_password, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -1,19 +1,41 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 
 from app.config import settings
 
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+# insert() with on_conflict_do_update() for upserts, for the configured dialect
+upsert_insert = sqlite_insert if IS_SQLITE else postgresql_insert
+
 # Create async engine with appropriate settings for SQLite vs PostgreSQL
 connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
+engine_kwargs = {}
+if IS_SQLITE:
     connect_args["check_same_thread"] = False
+else:
+    # Size the pool explicitly - the default (5 + 10 overflow) caps concurrency
+    # long before CPU does. Connections are primed at startup by warm_pool(),
+    # so skip the per-checkout pre-ping round-trip.
+    engine_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=False,
+    )
 
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    echo=settings.DB_ECHO,
     future=True,
     connect_args=connect_args,
+    **engine_kwargs,
 )
 
 # Create async session factory
@@ -30,14 +52,14 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
-async def get_session() -> AsyncSession:
-    """Dependency to get database session."""
-    async with async_session() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+async def warm_pool():
+    """Open every pooled connection up front so first requests skip the connect handshake."""
+    if IS_SQLITE:
+        return
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Connect concurrently so each ping checks out a distinct connection
+    await asyncio.gather(*(ping() for _ in range(settings.DB_POOL_SIZE)))
@@ -1,9 +1,14 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, warm_pool
+from app.core.security import start_kdf_pool, shutdown_kdf_pool
+from app.services.email_service import close_email_client, start_email_dispatcher, stop_email_dispatcher
+from app.services.holiday_calendar import warm_holiday_dates
+from app.services.token_cleanup import start_token_purge, stop_token_purge
 from app.api.v1.router import api_router
 
 
@@ -12,15 +17,24 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     # Startup
     await init_db()
+    await warm_pool()
+    await warm_holiday_dates()
+    start_kdf_pool()
+    start_token_purge()
+    start_email_dispatcher()
     yield
     # Shutdown
-    pass
+    await stop_token_purge()
+    await stop_email_dispatcher()
+    await close_email_client()
+    shutdown_kdf_pool()
 
 
 app = FastAPI(
     title=settings.APP_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
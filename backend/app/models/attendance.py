@@ -1,7 +1,8 @@
 import datetime as dt
 from enum import Enum
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, Column, DateTime
+from app.utils.dates import utc_now
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -25,7 +26,7 @@ class AttendanceSource(str, Enum):
 
 
 class AttendanceLogBase(SQLModel):
-    date: dt.date = Field(index=True)
+    date: dt.date
     status: AttendanceStatus
     source: AttendanceSource = Field(default=AttendanceSource.MANUAL)
     notes: Optional[str] = None
@@ -33,12 +34,22 @@ class AttendanceLogBase(SQLModel):
 
 class AttendanceLog(AttendanceLogBase, table=True):
     __tablename__ = "attendance_logs"
+    # The unique constraint's (user_id, date) index also serves every per-user
+    # date range query, so date needs no index of its own
     __table_args__ = (UniqueConstraint("user_id", "date", name="unique_user_date"),)
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
-    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
-    updated_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
+    created_at: Optional[dt.datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now()),
+    )
+    updated_at: Optional[dt.datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now(), onupdate=utc_now()),
+    )
 
     user: "User" = Relationship(back_populates="attendance_logs")
 
@@ -2,7 +2,8 @@
 import datetime as dt
 from enum import Enum
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Column, DateTime
+from app.utils.dates import utc_now
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -16,6 +17,8 @@ class FeedbackRating(str, Enum):
 class ChatFeedback(SQLModel, table=True):
     """Store feedback on AI chat responses."""
     __tablename__ = "chat_feedback"
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -23,7 +26,10 @@ class ChatFeedback(SQLModel, table=True):
     ai_response: str  # What the AI responded
     rating: FeedbackRating  # Thumbs up or down
     comment: Optional[str] = None  # Optional feedback text
-    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
+    created_at: Optional[dt.datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now()),
+    )
 
     user: "User" = Relationship()
 
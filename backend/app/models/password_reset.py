@@ -1,30 +1,76 @@
 """Password reset token model."""
+import base64
 import datetime as dt
-import secrets
+import os
+import threading
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Column, DateTime, Index, text
+from app.utils.dates import utc_now
 
 if TYPE_CHECKING:
     from app.models.user import User
 
+TOKEN_BYTES = 32
+_TOKENS_PER_REFILL = 64
+
+# Random bytes are read from the OS in blocks of 64 tokens and handed out in
+# 32-byte slices, so a burst of resets costs one getrandom() call per 64 tokens
+_token_buffer = bytearray()
+_token_lock = threading.Lock()
+
+
+def _reset_token_buffer() -> None:
+    """Discard buffered bytes so a forked worker never reuses its parent's tokens."""
+    global _token_lock
+    _token_buffer.clear()
+    _token_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_token_buffer)
+
+
+def _next_token_bytes() -> bytes:
+    """Take the next unused random slice, refilling the buffer when empty."""
+    with _token_lock:
+        if not _token_buffer:
+            _token_buffer.extend(os.urandom(TOKEN_BYTES * _TOKENS_PER_REFILL))
+        chunk = bytes(_token_buffer[:TOKEN_BYTES])
+        del _token_buffer[:TOKEN_BYTES]
+    return chunk
+
 
 class PasswordResetToken(SQLModel, table=True):
     """Store password reset tokens."""
     __tablename__ = "password_reset_tokens"
+    # Partial index over unused tokens only - used/expired rows pile up, but the
+    # per-user "invalidate open tokens" lookup only ever wants the live ones
+    __table_args__ = (
+        Index(
+            "ix_password_reset_tokens_unused_user",
+            "user_id",
+            postgresql_where=text("used = false"),
+            sqlite_where=text("used = 0"),
+        ),
+    )
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
     token: str = Field(index=True, unique=True)
     expires_at: dt.datetime
     used: bool = Field(default=False)
-    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
+    created_at: Optional[dt.datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now()),
+    )
 
     user: "User" = Relationship()
 
     @classmethod
     def generate_token(cls) -> str:
-        """Generate a secure random token."""
-        return secrets.token_urlsafe(32)
+        """Generate a secure random token (same format as secrets.token_urlsafe(32))."""
+        return base64.urlsafe_b64encode(_next_token_bytes()).rstrip(b"=").decode("ascii")
 
     def is_valid(self) -> bool:
         """Check if token is still valid."""
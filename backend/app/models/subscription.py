@@ -1,7 +1,9 @@
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Column, DateTime
+from app.utils.dates import utc_now
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -20,7 +22,7 @@ class SubscriptionStatus(str, Enum):
 
 
 # Tier limits configuration
-TIER_LIMITS = {
+_RAW_TIER_LIMITS = {
     SubscriptionTier.FREE: {
         "ai_requests_per_month": 20,
         "calendar_sync_enabled": False,
@@ -36,10 +38,16 @@ TIER_LIMITS = {
         "predictive_analytics": True,
     },
 }
+# Read-only views so shared limits can't be mutated at runtime
+TIER_LIMITS = MappingProxyType(
+    {tier: MappingProxyType(limits) for tier, limits in _RAW_TIER_LIMITS.items()}
+)
 
 
 class Subscription(SQLModel, table=True):
     __tablename__ = "subscriptions"
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", unique=True, index=True)
@@ -48,8 +56,14 @@ class Subscription(SQLModel, table=True):
     stripe_subscription_id: Optional[str] = None
     status: SubscriptionStatus = Field(default=SubscriptionStatus.ACTIVE)
     current_period_end: Optional[datetime] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now()),
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now(), onupdate=utc_now()),
+    )
 
     user: "User" = Relationship(back_populates="subscription")
 
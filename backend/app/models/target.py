@@ -1,7 +1,8 @@
 import datetime as dt
 from enum import Enum
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Column, DateTime
+from app.utils.dates import utc_now
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -23,11 +24,16 @@ class TargetBase(SQLModel):
 
 class Target(TargetBase, table=True):
     __tablename__ = "targets"
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
     is_active: bool = Field(default=True)
-    created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow)
+    created_at: Optional[dt.datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now()),
+    )
 
     user: "User" = Relationship(back_populates="targets")
 
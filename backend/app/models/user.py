@@ -1,7 +1,8 @@
 from datetime import datetime
 from enum import Enum
 from typing import Optional, List, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Column, DateTime
+from app.utils.dates import utc_now
 
 if TYPE_CHECKING:
     from app.models.attendance import AttendanceLog
@@ -24,17 +25,34 @@ class UserBase(SQLModel):
 
 class User(UserBase, table=True):
     __tablename__ = "users"
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
     hashed_password: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now()),
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=utc_now(), onupdate=utc_now()),
+    )
     has_seen_intro: Optional[bool] = Field(default=False, nullable=True)
 
     # Relationships
-    attendance_logs: List["AttendanceLog"] = Relationship(back_populates="user")
-    targets: List["Target"] = Relationship(back_populates="user")
-    subscription: Optional["Subscription"] = Relationship(back_populates="user")
+    # User is loaded on every authenticated request, so the unbounded collections
+    # never load implicitly - queries that need them opt in with selectinload().
+    # The 1:1 subscription rides along as a single JOIN.
+    attendance_logs: List["AttendanceLog"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"lazy": "raise"}
+    )
+    targets: List["Target"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"lazy": "raise"}
+    )
+    subscription: Optional["Subscription"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"lazy": "joined"}
+    )
 
 
 class UserCreate(SQLModel):
@@ -1,6 +1,11 @@
-import json
+import asyncio
+import functools
+import re
+import time
+from collections import OrderedDict
 from datetime import date, timedelta
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, and_
 
@@ -9,13 +14,75 @@ from app.models.attendance import AttendanceLog, AttendanceStatus
 
 # Try to import anthropic, but don't fail if not installed
 try:
-    from anthropic import Anthropic
+    from anthropic import AsyncAnthropic
     ANTHROPIC_AVAILABLE = True
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
+# One client for the process - AIService is built per request, and sharing the
+# client keeps its connection pool (and open TLS connections) alive between them
+_client = (
+    AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+    if ANTHROPIC_AVAILABLE and settings.ANTHROPIC_API_KEY
+    else None
+)
+
+# Enum members used on hot paths, bound once (Enum class attribute lookup is slow)
+_IN_OFFICE = AttendanceStatus.IN_OFFICE
+_WFH = AttendanceStatus.WFH
+_WFH_EXEMPT = AttendanceStatus.WFH_EXEMPT
+_SICK_LEAVE = AttendanceStatus.SICK_LEAVE
+_ANNUAL_LEAVE = AttendanceStatus.ANNUAL_LEAVE
+
+# Model output repeats the same date strings across entries and calls; dates
+# are immutable, so memoize the conversion
+_parse_date = functools.lru_cache(maxsize=1024)(date.fromisoformat)
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# Plain dict lookup - no Enum __new__ call and no exception for unknown values
+_STATUS_BY_VALUE = {s.value: s for s in AttendanceStatus}
+
+# Weekday names indexed by date.weekday()
+_DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_DAY_NAMES_TITLE = tuple(name.title() for name in _DAY_NAMES)
+
+# Keyword groups recognised by _fallback_parse: (group name, kind, value, keywords)
+_FALLBACK_GROUPS = (
+    ("wfh_exempt", "status", _WFH_EXEMPT, ("approved wfh", "exempt", "discretionary")),
+    ("wfh", "status", _WFH, ("work from home", "remote", "wfh")),
+    ("sick", "status", _SICK_LEAVE, ("sick", "ill", "unwell", "doctor")),
+    ("leave", "status", _ANNUAL_LEAVE, ("leave", "off", "vacation", "pto", "holiday")),
+    ("today", "flag", "today", ("today",)),
+    ("yesterday", "flag", "yesterday", ("yesterday",)),
+    ("last", "flag", "last", ("last",)),
+    *((name[:3], "day", i, (name,)) for i, name in enumerate(_DAY_NAMES)),
+)
+# One case-insensitive alternation of named groups, so the input is scanned once
+# and each hit dispatches on match.lastgroup. Whole words only, so "office"
+# doesn't read as "off" and "will" as "ill".
+_FALLBACK_KEYWORD_RE = re.compile(
+    r"\b(?:"
+    + "|".join(
+        f"(?P<{name}>" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + ")"
+        for name, _, _, keywords in _FALLBACK_GROUPS
+    )
+    + r")\b",
+    re.IGNORECASE,
+)
+_FALLBACK_GROUP_VALUES = {name: (kind, value) for name, kind, value, _ in _FALLBACK_GROUPS}
+# Inputs that mention dates, months or are long need the stronger model;
+# short relative phrases ("wfh today", "in office monday") go to the fast one
+_FAST_PARSE_MAX_LENGTH = 80
+_COMPLEX_PARSE_INPUT_RE = re.compile(
+    r"\d|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)", re.IGNORECASE
+)
+
+# When several statuses are mentioned, the first one here wins
+_FALLBACK_STATUS_PRIORITY = (_WFH_EXEMPT, _WFH, _SICK_LEAVE, _ANNUAL_LEAVE)
+
 
 class ParsedEntry:
+    __slots__ = ("date", "status", "confidence")
+
     def __init__(self, date: date, status: AttendanceStatus, confidence: float = 1.0):
         self.date = date
         self.status = status
@@ -23,18 +90,19 @@ class ParsedEntry:
 
 
 class Suggestion:
+    __slots__ = ("type", "message", "priority")
+
     def __init__(self, type: str, message: str, priority: int):
         self.type = type
         self.message = message
         self.priority = priority
 
 
+# Static instructions only - per-request values go in the user message, so the
+# system prompt stays identical across calls
 NATURAL_LANGUAGE_PARSE_PROMPT = """You are an attendance parsing assistant. Parse the user's natural language input into structured attendance entries.
 
-Current date: {current_date} ({current_day})
-Current year: {current_year}
-
-User input: "{user_input}"
+The user message gives the current date, the current year and the user's input.
 
 Rules:
 1. Valid statuses: "in_office", "wfh", "wfh_exempt", "annual_leave", "sick_leave"
@@ -56,121 +124,265 @@ IMPORTANT - Week calculations:
 When user says "every Monday in first week of March", find the Monday(s) that fall between March 1-7.
 When user says "Monday, Wednesday, Friday in weeks 1 and 3", find those days in both week ranges.
 
-For month names without a year, use {current_year}. If the month has already passed this year, use the next occurrence.
+For month names without a year, use the current year. If the month has already passed this year, use the next occurrence.
 
-Example 1: "every Monday in March" -> all Mondays in March {current_year}
+Example 1: "every Monday in March" -> all Mondays in March of the current year
 Example 2: "Mon/Wed/Fri in first and third week of March" -> find Mon/Wed/Fri in March 1-7 AND March 15-21
 
-Respond with ONLY a valid JSON array of objects with "date" (YYYY-MM-DD format) and "status" fields.
-If the input is unclear or invalid, respond with an empty array [].
+Record the result by calling the record_entries tool with one entry per day, each with a "date" (YYYY-MM-DD format) and a "status".
+If the input is unclear or invalid, call it with an empty entries list.
+
+Example entries:
+[{"date": "2026-03-02", "status": "in_office"}, {"date": "2026-03-04", "status": "in_office"}, {"date": "2026-03-06", "status": "in_office"}]"""
+
+# No cache_control marker: prompt caching needs a prefix of at least 1024 tokens
+# (more on Haiku) and this prompt plus the tool is about 700, so a marker would
+# be silently ignored. Add one if the instructions grow past the minimum.
+_PARSE_SYSTEM = [
+    {"type": "text", "text": NATURAL_LANGUAGE_PARSE_PROMPT},
+]
+
+# Parses come back as the input of a forced tool call, so the API enforces the
+# shape and there is no free text to strip or decode
+_RECORD_ENTRIES_TOOL = {
+    "name": "record_entries",
+    "description": "Record the attendance entries described by the user.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "entries": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "date": {"type": "string", "format": "date"},
+                        "status": {
+                            "type": "string",
+                            "enum": ["in_office", "wfh", "wfh_exempt", "annual_leave", "sick_leave"],
+                        },
+                    },
+                    "required": ["date", "status"],
+                },
+            },
+        },
+        "required": ["entries"],
+    },
+}
+
+
+CHAT_SYSTEM_PROMPT = """You are a friendly AI attendance assistant helping users meet their office attendance target.
+
+How the calculation works:
+- Office % = Office Days ÷ Work Days
+- Work Days = Business Days - Leave Days - WFH Exempt Days
+- This means leave and WFH exempt days don't count against you
+- Each month starts fresh at 0%
+
+Guidelines:
+1. Be friendly, supportive, and encouraging
+2. Give specific, actionable advice based on their actual numbers
+3. Keep responses concise (2-4 sentences usually)
+4. If they're on track, celebrate! If behind, be supportive not judgmental
+5. Consider both actual AND planned office days when giving advice
+6. If they have planned office days, mention them positively
+7. Each month starts fresh - no carryover from previous months
 
-Example response:
-[{{"date": "2026-03-02", "status": "in_office"}}, {{"date": "2026-03-04", "status": "in_office"}}, {{"date": "2026-03-06", "status": "in_office"}}]"""
+Help the user understand their progress and give practical tips for meeting their target. Their current numbers follow."""
+
+# Uncached for the same reason as _PARSE_SYSTEM (about 225 tokens)
+_CHAT_SYSTEM = [
+    {"type": "text", "text": CHAT_SYSTEM_PROMPT},
+]
+
+
+@functools.lru_cache(maxsize=32)
+def _date_header(current_date: date) -> str:
+    """Date lines of the parse request - the same for every parse on a given day."""
+    return (
+        f"Current date: {current_date.isoformat()} ({current_date.strftime('%A')})\n"
+        f"Current year: {current_date.year}\n\n"
+    )
+
+
+def _render_parse_request(user_input: str, current_date: date) -> str:
+    """Per-request part of the parse prompt (sent as the user message)."""
+    return f'{_date_header(current_date)}User input: "{user_input}"'
+
+
+# Upper bound on waiting for Claude before falling back (the SDK default is 10 minutes)
+_CLAUDE_TIMEOUT_SECONDS = 10.0
+
+# Successful model parses keyed by (normalised input, date), least recently used first.
+# Retries and duplicate tabs send identical text; serve them without another API call.
+_PARSE_CACHE_MAX_ENTRIES = 2048
+_PARSE_CACHE_TTL_SECONDS = 600
+_parse_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires_at, entries)
+# Parses currently waiting on the API, by the same key
+_inflight_parses: "dict[tuple, asyncio.Future]" = {}
+
+
+def _finish_inflight_parse(cache_key: tuple, task: asyncio.Future):
+    _inflight_parses.pop(cache_key, None)
+    # Mark any error as retrieved - if every waiter was cancelled, nobody else will
+    if not task.cancelled():
+        task.exception()
+
+
+def _fallback_chat_reply(context: dict) -> str:
+    """Answer a chat message from the stats alone when Claude is unavailable."""
+    pct = context.get('current_percentage', 0)
+    projected = context.get('projected_percentage', 0)
+    target = context.get('target_percentage', 50)
+    needed = context.get('days_needed', 0)
+    remaining = context.get('remaining_days', 0)
+    planned = context.get('planned_office_days', 0)
+    office = context.get('office_days', 0)
+    work_days = context.get('work_days', 1)
+
+    if projected >= target:
+        if planned > 0:
+            return f"You're doing great! At {pct}% actual with {planned} day(s) planned, you'll reach {projected}% - above your {target}% target!"
+        return f"You're doing great! At {pct}%, you've already hit your {target}% target. Keep it up!"
+    elif needed <= remaining:
+        planned_msg = f" (with {planned} already planned)" if planned > 0 else ""
+        return f"You're at {pct}%{planned_msg} and need {needed} more office day(s) to reach {target}%. You have {remaining} business days left - totally achievable!"
+    else:
+        max_pct = ((office + planned + remaining) / work_days * 100) if work_days > 0 else 0
+        return f"You're at {pct}% with {remaining} days left. Even going to office every remaining day, you'd reach {max_pct:.0f}%. Focus on maximizing office days and plan better for next month."
+
+
+def _chat_error_reply(context: dict) -> str:
+    """Reply used when the Claude call fails."""
+    return f"I'm having trouble connecting right now. Your current stats: {context.get('current_percentage', 0)}% office attendance ({context.get('office_days', 0)} days). Target: {context.get('target_percentage', 50)}%."
 
 
 class AIService:
     def __init__(self):
-        self.client = None
+        self.client = _client
         self.model = "claude-sonnet-4-20250514"
-
-        if ANTHROPIC_AVAILABLE and settings.ANTHROPIC_API_KEY:
-            self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.fast_model = "claude-haiku-4-5"
 
     async def parse_natural_language(
         self,
         user_input: str,
         current_date: date,
-    ) -> List[dict]:
+    ) -> List[ParsedEntry]:
         """Parse natural language input into structured attendance entries."""
 
         # If no AI available, use simple fallback parsing
         if not self.client:
             return self._fallback_parse(user_input, current_date)
 
-        prompt = NATURAL_LANGUAGE_PARSE_PROMPT.format(
-            user_input=user_input,
-            current_date=current_date.isoformat(),
-            current_day=current_date.strftime("%A"),
-            current_year=current_date.year,
-        )
+        cache_key = (user_input.strip().casefold(), current_date.toordinal())
+        cached = _parse_cache.get(cache_key)
+        if cached is not None:
+            expires_at, cached_entries = cached
+            if time.monotonic() < expires_at:
+                _parse_cache.move_to_end(cache_key)
+                # Fresh objects so callers can't alter the cached ones
+                return [ParsedEntry(e.date, e.status, e.confidence) for e in cached_entries]
+            del _parse_cache[cache_key]
+
+        # Join an identical parse that is already waiting on Claude rather than
+        # sending a second request
+        task = _inflight_parses.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_parse(user_input, current_date, cache_key))
+            _inflight_parses[cache_key] = task
+            task.add_done_callback(functools.partial(_finish_inflight_parse, cache_key))
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}],
-            )
-
-            # Parse JSON response
-            content = response.content[0].text.strip()
-            entries = json.loads(content)
-
-            # Validate and convert entries
-            result = []
-            for entry in entries:
-                try:
-                    entry_date = date.fromisoformat(entry["date"])
-                    status = AttendanceStatus(entry["status"])
-                    result.append({
-                        "date": entry_date,
-                        "status": status,
-                        "confidence": 1.0,
-                    })
-                except (ValueError, KeyError):
-                    continue
-
-            return result
-
+            # Shielded so one caller disconnecting doesn't cancel the others' parse
+            entries = await asyncio.shield(task)
         except Exception as e:
             # Fallback to simple parsing on error
             return self._fallback_parse(user_input, current_date)
+        return [ParsedEntry(e.date, e.status, e.confidence) for e in entries]
 
-    def _fallback_parse(self, user_input: str, current_date: date) -> List[dict]:
+    async def _request_parse(self, user_input: str, current_date: date, cache_key: tuple) -> tuple:
+        """Ask Claude to parse the input and cache the entries on success."""
+        # Simple inputs produce a line or two of JSON - use the faster model
+        if len(user_input) < _FAST_PARSE_MAX_LENGTH and not _COMPLEX_PARSE_INPUT_RE.search(user_input):
+            model, max_tokens = self.fast_model, 256
+        else:
+            model, max_tokens = self.model, 1024
+
+        # Bounded so a slow API falls back to keyword parsing instead of hanging
+        response = await asyncio.wait_for(
+            self.client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                system=_PARSE_SYSTEM,
+                tools=[_RECORD_ENTRIES_TOOL],
+                tool_choice={"type": "tool", "name": "record_entries"},
+                messages=[{"role": "user", "content": _render_parse_request(user_input, current_date)}],
+            ),
+            timeout=_CLAUDE_TIMEOUT_SECONDS,
+        )
+
+        # Forced tool call - the first block holds the entries
+        entries = response.content[0].input["entries"]
+
+        # Convert entries, skipping any the model got wrong
+        result = []
+        for entry in entries:
+            status = _STATUS_BY_VALUE.get(entry.get("status"))
+            raw_date = entry.get("date")
+            if status is None or not isinstance(raw_date, str) or not _ISO_DATE_RE.fullmatch(raw_date):
+                continue
+            try:
+                entry_date = _parse_date(raw_date)
+            except ValueError:  # well-formed but impossible, e.g. 2026-02-30
+                continue
+            result.append(ParsedEntry(entry_date, status, 1.0))
+        result = tuple(result)
+
+        # Only successful parses are cached - the fallback never is
+        _parse_cache[cache_key] = (time.monotonic() + _PARSE_CACHE_TTL_SECONDS, result)
+        if len(_parse_cache) > _PARSE_CACHE_MAX_ENTRIES:
+            _parse_cache.popitem(last=False)
+        return result
+
+    def _fallback_parse(self, user_input: str, current_date: date) -> List[ParsedEntry]:
         """Simple fallback parsing without AI."""
         entries = []
-        text = user_input.lower()
+
+        # Collect every keyword in a single pass over the text
+        statuses = set()
+        flags = set()
+        days = set()
+        for match in _FALLBACK_KEYWORD_RE.finditer(user_input):
+            kind, value = _FALLBACK_GROUP_VALUES[match.lastgroup]
+            if kind == "status":
+                statuses.add(value)
+            elif kind == "flag":
+                flags.add(value)
+            else:
+                days.add(value)
 
         # Detect status
-        status = AttendanceStatus.IN_OFFICE
-        if "exempt" in text or "approved wfh" in text or "discretionary" in text:
-            status = AttendanceStatus.WFH_EXEMPT
-        elif "wfh" in text or "work from home" in text or "remote" in text:
-            status = AttendanceStatus.WFH
-        elif "sick" in text or "ill" in text or "unwell" in text or "doctor" in text:
-            status = AttendanceStatus.SICK_LEAVE
-        elif "leave" in text or "off" in text or "vacation" in text or "pto" in text or "holiday" in text:
-            status = AttendanceStatus.ANNUAL_LEAVE
+        status = next((s for s in _FALLBACK_STATUS_PRIORITY if s in statuses), _IN_OFFICE)
 
         # Detect date
         target_date = current_date
 
-        if "today" in text:
+        if "today" in flags:
             target_date = current_date
-        elif "yesterday" in text:
+        elif "yesterday" in flags:
             target_date = current_date - timedelta(days=1)
 
         # Check for day names
-        day_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        for i, day_name in enumerate(day_names):
-            if day_name in text:
-                # Find the most recent occurrence of this day
-                days_back = (current_date.weekday() - i) % 7
-                if days_back == 0 and "last" in text:
-                    days_back = 7
-                target_date = current_date - timedelta(days=days_back)
-                entries.append({
-                    "date": target_date,
-                    "status": status,
-                    "confidence": 0.7,
-                })
+        for i in sorted(days):
+            # Find the most recent occurrence of this day
+            days_back = (current_date.weekday() - i) % 7
+            if days_back == 0 and "last" in flags:
+                days_back = 7
+            target_date = current_date - timedelta(days=days_back)
+            entries.append(ParsedEntry(target_date, status, 0.7))
 
         # If no day names found, use today
         if not entries:
-            entries.append({
-                "date": target_date,
-                "status": status,
-                "confidence": 0.5,
-            })
+            entries.append(ParsedEntry(target_date, status, 0.5))
 
         return entries
 
@@ -181,13 +393,12 @@ class AIService:
         db: AsyncSession,
     ) -> dict:
         """Generate a personalized greeting with onboarding info."""
-        first_name = user_name.split()[0] if user_name else "there"
+        first_name = user_name.split(None, 1)[0] if user_name else "there"
 
         # Check if user has any attendance logs (new user detection)
-        result = await db.execute(
-            select(AttendanceLog).where(AttendanceLog.user_id == user_id).limit(1)
+        has_logs = await db.scalar(
+            select(exists().where(AttendanceLog.user_id == user_id))
         )
-        has_logs = result.scalar_one_or_none() is not None
 
         if not has_logs:
             # New user - provide onboarding
@@ -224,7 +435,7 @@ class AIService:
         db: AsyncSession,
     ) -> dict:
         """Generate simple welcome content for first-time users. Stats are handled by the chat bubble."""
-        first_name = user_name.split()[0] if user_name else "there"
+        first_name = user_name.split(None, 1)[0] if user_name else "there"
 
         # Simple welcome message - no statistics (chat bubble handles that)
         welcome_message = f"Welcome to Attendance Tracker, {first_name}! I'm your AI attendance assistant, here to help you track your office attendance and meet your {target_percentage:.0f}% target."
@@ -252,64 +463,66 @@ class AIService:
         self,
         user_id: int,
         db: AsyncSession,
-    ) -> List[dict]:
+    ) -> List[Suggestion]:
         """Generate suggestions based on user's attendance patterns."""
         suggestions = []
 
-        # Get recent attendance logs
-        week_ago = date.today() - timedelta(days=7)
+        # Get recent attendance logs (just the columns used below, as plain rows)
+        today = date.today()
+        week_ago = today - timedelta(days=7)
         result = await db.execute(
-            select(AttendanceLog).where(
+            select(AttendanceLog.date, AttendanceLog.status).where(
                 and_(
                     AttendanceLog.user_id == user_id,
                     AttendanceLog.date >= week_ago,
                 )
-            ).order_by(AttendanceLog.date.desc())
+            )
         )
-        recent_logs = result.scalars().all()
+        recent_logs = result.all()
+
+        # One pass: logged dates, workdays logged in the past week, and office
+        # days tallied per weekday (Mon-Fri)
+        logged_dates = set()
+        past_workdays_logged = 0
+        weekday_counts = [0] * 5
+        for log_date, log_status in recent_logs:
+            logged_dates.add(log_date)
+            weekday = log_date.weekday()
+            if weekday < 5:
+                if log_date < today:
+                    past_workdays_logged += 1
+                if log_status == _IN_OFFICE:
+                    weekday_counts[weekday] += 1
 
         # Check if today is logged
-        today = date.today()
-        today_logged = any(log.date == today for log in recent_logs)
+        today_logged = today in logged_dates
 
         if not today_logged and today.weekday() < 5:  # Weekday
-            suggestions.append({
-                "type": "reminder",
-                "message": "Don't forget to log your attendance for today!",
-                "priority": 1,
-            })
+            suggestions.append(Suggestion(
+                "reminder", "Don't forget to log your attendance for today!", 1
+            ))
 
         # Check for gaps in recent days
         if recent_logs:
-            logged_dates = {log.date for log in recent_logs}
-            current = today - timedelta(days=1)
-            gap_days = 0
-            while current >= week_ago:
-                if current.weekday() < 5 and current not in logged_dates:
-                    gap_days += 1
-                current -= timedelta(days=1)
+            # Any 7 consecutive days hold exactly 5 weekdays, and there is
+            # at most one log per date
+            gap_days = 5 - past_workdays_logged
 
             if gap_days > 0:
-                suggestions.append({
-                    "type": "warning",
-                    "message": f"You have {gap_days} unlogged workday(s) in the past week.",
-                    "priority": 2,
-                })
+                suggestions.append(Suggestion(
+                    "warning", f"You have {gap_days} unlogged workday(s) in the past week.", 2
+                ))
 
-        # Pattern-based suggestion
+        # Pattern-based suggestion: the weekday with the most office days
         if len(recent_logs) >= 3:
-            office_days = [log.date.weekday() for log in recent_logs if log.status == AttendanceStatus.IN_OFFICE]
-            if office_days:
-                # Find most common office day
-                from collections import Counter
-                common_day = Counter(office_days).most_common(1)[0][0]
-                day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+            common_day = max(range(5), key=weekday_counts.__getitem__)
+            if weekday_counts[common_day]:
                 if today.weekday() == common_day and not today_logged:
-                    suggestions.append({
-                        "type": "recommendation",
-                        "message": f"You often go to office on {day_names[common_day]}s. Planning to go today?",
-                        "priority": 3,
-                    })
+                    suggestions.append(Suggestion(
+                        "recommendation",
+                        f"You often go to office on {_DAY_NAMES_TITLE[common_day]}s. Planning to go today?",
+                        3,
+                    ))
 
         return suggestions
 
@@ -319,10 +532,19 @@ class AIService:
         context: dict,
     ) -> str:
         """Chat with the AI about attendance, targets, and tips."""
+        try:
+            return "".join([chunk async for chunk in self.stream_chat(message, context)]).strip()
+        except Exception:
+            # Failed part-way through - a cut-off reply must not pass as a full one
+            return _chat_error_reply(context)
 
-        system_prompt = f"""You are a friendly AI attendance assistant helping users meet their office attendance target.
-
-Current user context:
+    async def stream_chat(
+        self,
+        message: str,
+        context: dict,
+    ) -> AsyncIterator[str]:
+        """Stream the chat reply as text chunks as Claude produces them."""
+        user_context = f"""Current user context:
 - Name: {context.get('user_name', 'User')}
 - Target: {context.get('target_percentage', 50)}% office attendance
 - Current percentage: {context.get('current_percentage', 0)}% (based on actual office days so far)
@@ -336,55 +558,29 @@ Current user context:
 - Remaining business days: {context.get('remaining_days', 0)}
 - Target office days needed: {context.get('target_office_days', 0)}
 - Additional office days still needed: {context.get('days_needed', 0)}
-- Projected percentage if plans kept: {context.get('projected_percentage', 0)}%
-
-How the calculation works:
-- Office % = Office Days ÷ Work Days
-- Work Days = Business Days - Leave Days - WFH Exempt Days
-- This means leave and WFH exempt days don't count against you
-- Each month starts fresh at 0%
-
-Guidelines:
-1. Be friendly, supportive, and encouraging
-2. Give specific, actionable advice based on their actual numbers
-3. Keep responses concise (2-4 sentences usually)
-4. If they're on track, celebrate! If behind, be supportive not judgmental
-5. Consider both actual AND planned office days when giving advice
-6. If they have planned office days, mention them positively
-7. Each month starts fresh - no carryover from previous months
-
-Help the user understand their progress and give practical tips for meeting their target."""
+- Projected percentage if plans kept: {context.get('projected_percentage', 0)}%"""
 
         if not self.client:
-            # Fallback response without AI
-            pct = context.get('current_percentage', 0)
-            projected = context.get('projected_percentage', 0)
-            target = context.get('target_percentage', 50)
-            needed = context.get('days_needed', 0)
-            remaining = context.get('remaining_days', 0)
-            planned = context.get('planned_office_days', 0)
-            office = context.get('office_days', 0)
-            work_days = context.get('work_days', 1)
-
-            if projected >= target:
-                if planned > 0:
-                    return f"You're doing great! At {pct}% actual with {planned} day(s) planned, you'll reach {projected}% - above your {target}% target!"
-                return f"You're doing great! At {pct}%, you've already hit your {target}% target. Keep it up!"
-            elif needed <= remaining:
-                planned_msg = f" (with {planned} already planned)" if planned > 0 else ""
-                return f"You're at {pct}%{planned_msg} and need {needed} more office day(s) to reach {target}%. You have {remaining} business days left - totally achievable!"
-            else:
-                max_pct = ((office + planned + remaining) / work_days * 100) if work_days > 0 else 0
-                return f"You're at {pct}% with {remaining} days left. Even going to office every remaining day, you'd reach {max_pct:.0f}%. Focus on maximizing office days and plan better for next month."
+            yield _fallback_chat_reply(context)
+            return
 
+        sent_any = False
         try:
-            response = self.client.messages.create(
+            async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=512,
-                system=system_prompt,
+                # Static instructions first, then this user's numbers
+                system=[*_CHAT_SYSTEM, {"type": "text", "text": user_context}],
                 messages=[{"role": "user", "content": message}],
-            )
-            return response.content[0].text.strip()
-        except Exception as e:
-            # Fallback on error
-            return f"I'm having trouble connecting right now. Your current stats: {context.get('current_percentage', 0)}% office attendance ({context.get('office_days', 0)} days). Target: {context.get('target_percentage', 50)}%."
+                # Per read, so a stalled connection fails but a long reply isn't cut off
+                timeout=_CLAUDE_TIMEOUT_SECONDS,
+            ) as stream:
+                async for text in stream.text_stream:
+                    sent_any = True
+                    yield text
+        except Exception:
+            # Nothing sent yet: answer with the fallback. Otherwise re-raise so a
+            # streaming response is aborted rather than ending as if complete.
+            if sent_any:
+                raise
+            yield _chat_error_reply(context)
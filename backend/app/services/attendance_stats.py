@@ -0,0 +1,45 @@
+"""Attendance status counts aggregated in the database."""
+from collections import Counter
+from datetime import date
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, and_, func
+
+from app.models.attendance import AttendanceLog, AttendanceStatus
+from app.utils.dates import date_range_filter
+
+
+async def count_statuses(
+    db: AsyncSession,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    today: Optional[date] = None,
+) -> Counter:
+    """Count a user's logs in [start_date, end_date] with a single GROUP BY.
+
+    Keys are (status, is_future) pairs, where is_future means the log date is
+    after today - logged office/WFH days in the future count as planned.
+    Missing keys read as 0.
+    """
+    if today is None:
+        today = date.today()
+    is_future = (AttendanceLog.date > today).label("is_future")
+
+    result = await db.execute(
+        select(AttendanceLog.status, is_future, func.count())
+        .where(
+            and_(
+                AttendanceLog.user_id == user_id,
+                *date_range_filter(AttendanceLog.date, start_date, end_date),
+            )
+        )
+        .group_by(AttendanceLog.status, is_future)
+    )
+    return Counter({(status, bool(future)): count for status, future, count in result.all()})
+
+
+def status_total(counts: Counter, status: AttendanceStatus) -> int:
+    """Total logs with a status, past and future."""
+    return counts[status, False] + counts[status, True]
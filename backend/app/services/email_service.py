@@ -1,51 +1,223 @@
 """Email service using Resend."""
-import resend
+import asyncio
+import html
+import random
+import string
+import time
+from typing import Optional
+
+import httpx
 from app.config import settings
 
+RESEND_EMAILS_URL = "https://api.resend.com/emails"
 
-class EmailService:
-    """Service for sending emails via Resend."""
+# Rate limits and server errors are retried with exponential backoff (or the
+# server's Retry-After); other 4xx responses won't succeed on retry
+SEND_ATTEMPTS = 4
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRY_DELAY_SECONDS = 60.0
 
-    def __init__(self):
-        if settings.RESEND_API_KEY:
-            resend.api_key = settings.RESEND_API_KEY
+# Reset emails are queued and sent by a background dispatcher so the request
+# that triggered them doesn't wait on Resend
+EMAIL_QUEUE_SIZE = 10_000
+EMAIL_BATCH_SIZE = 20
+_SHUTDOWN_DRAIN_SECONDS = 10.0
 
-    async def send_password_reset_email(self, to_email: str, reset_url: str, user_name: str) -> bool:
-        """Send password reset email."""
-        if not settings.RESEND_API_KEY:
-            print(f"[DEV MODE] Password reset link for {to_email}: {reset_url}")
-            return True
+_email_queue: Optional[asyncio.Queue] = None
+_dispatch_task: Optional[asyncio.Task] = None
 
-        try:
-            resend.Emails.send({
-                "from": settings.EMAIL_FROM,
-                "to": [to_email],
-                "subject": "Reset Your Password - Attendance Tracker",
-                "html": f"""
+# Parsed once; only the per-recipient values are filled in at send time.
+# Values are HTML-escaped by the caller since they land inside markup.
+_RESET_TPL = string.Template("""
                 <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                     <h2 style="color: #333;">Password Reset Request</h2>
-                    <p>Hi {user_name},</p>
+                    <p>Hi ${user_name},</p>
                     <p>We received a request to reset your password for your Attendance Tracker account.</p>
                     <p>Click the button below to reset your password:</p>
                     <p style="text-align: center; margin: 30px 0;">
-                        <a href="{reset_url}"
+                        <a href="${reset_url}"
                            style="background-color: #4F46E5; color: white; padding: 12px 24px;
                                   text-decoration: none; border-radius: 6px; display: inline-block;">
                             Reset Password
                         </a>
                     </p>
                     <p>Or copy and paste this link into your browser:</p>
-                    <p style="word-break: break-all; color: #666;">{reset_url}</p>
-                    <p>This link will expire in {settings.RESET_TOKEN_EXPIRE_HOURS} hours.</p>
+                    <p style="word-break: break-all; color: #666;">${reset_url}</p>
+                    <p>This link will expire in ${hours} hours.</p>
                     <p>If you didn't request a password reset, you can safely ignore this email.</p>
                     <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
                     <p style="color: #999; font-size: 12px;">
                         Attendance Tracker - Your AI-powered attendance management tool
                     </p>
                 </div>
-                """,
-            })
+                """)
+
+
+# One pooled HTTP/2 client for the process, so sends reuse an open TLS connection
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared Resend client, created on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _client
+
+
+async def close_email_client():
+    """Close the pooled client (called at app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    """Seconds to wait before the next attempt."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(_MAX_RETRY_DELAY_SECONDS, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP-date form - fall back to backoff
+    return min(30.0, 0.5 * 2 ** attempt) + random.random() * 0.25
+
+
+class _AimdLimiter:
+    """Caps concurrent Resend calls, adapting the cap to how Resend responds.
+
+    Additive increase / multiplicative decrease: each fast successful send
+    raises the cap by 0.5, each rate limit, server error or network failure
+    halves it, so a burst converges on the rate Resend will accept.
+    """
+
+    def __init__(self, initial: float = 4.0, minimum: float = 1.0, maximum: float = 32.0):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def release(self, ok: bool, throttled: bool, latency: float):
+        async with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit * 0.5)
+            elif ok and latency <= _SEND_LATENCY_TARGET_SECONDS:
+                self.limit = min(self.maximum, self.limit + 0.5)
+            self._cond.notify_all()
+
+
+# Sends slower than this don't grow the concurrency cap
+_SEND_LATENCY_TARGET_SECONDS = 2.0
+_send_limiter = _AimdLimiter()
+
+
+async def _post_email(payload: dict) -> bool:
+    """POST one email to Resend, retrying transient failures."""
+    for attempt in range(SEND_ATTEMPTS):
+        response = None
+        await _send_limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = await _get_client().post(RESEND_EMAILS_URL, json=payload)
+        except httpx.HTTPError as e:
+            error = e
+        else:
+            if response.is_success:
+                return True
+            error = f"HTTP {response.status_code}: {response.text}"
+            if response.status_code not in _RETRY_STATUSES:
+                break
+        finally:
+            await _send_limiter.release(
+                ok=response is not None and response.is_success,
+                throttled=response is None or response.status_code in _RETRY_STATUSES,
+                latency=time.monotonic() - started,
+            )
+        if attempt + 1 < SEND_ATTEMPTS:
+            await asyncio.sleep(_retry_delay(response, attempt))
+    print(f"Error sending email: {error}")
+    return False
+
+
+async def _dispatch_loop(queue: asyncio.Queue):
+    while True:
+        # Wait for one email, then take whatever else is already queued
+        batch = [await queue.get()]
+        while len(batch) < EMAIL_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        try:
+            await asyncio.gather(*(_post_email(p) for p in batch), return_exceptions=True)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+def start_email_dispatcher():
+    """Start the background email sender (called at app startup)."""
+    global _email_queue, _dispatch_task
+    if _dispatch_task is None:
+        _email_queue = asyncio.Queue(maxsize=EMAIL_QUEUE_SIZE)
+        _dispatch_task = asyncio.create_task(_dispatch_loop(_email_queue))
+
+
+async def stop_email_dispatcher():
+    """Send what's still queued, then stop the dispatcher (called at app shutdown)."""
+    global _email_queue, _dispatch_task
+    if _dispatch_task is None:
+        return
+    try:
+        await asyncio.wait_for(_email_queue.join(), timeout=_SHUTDOWN_DRAIN_SECONDS)
+    except asyncio.TimeoutError:
+        print(f"Email dispatcher stopped with {_email_queue.qsize()} email(s) unsent")
+    _dispatch_task.cancel()
+    try:
+        await _dispatch_task
+    except asyncio.CancelledError:
+        pass
+    _email_queue = None
+    _dispatch_task = None
+
+
+async def _send_email(payload: dict) -> bool:
+    """Queue an email for the dispatcher, or send it inline if that isn't possible."""
+    if _email_queue is not None:
+        try:
+            _email_queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            pass  # Backlog is full - send this one inline instead
+    return await _post_email(payload)
+
+
+class EmailService:
+    """Service for sending emails via Resend."""
+
+    async def send_password_reset_email(self, to_email: str, reset_url: str, user_name: str) -> bool:
+        """Send password reset email (queued when the dispatcher is running)."""
+        if not settings.RESEND_API_KEY:
+            print(f"[DEV MODE] Password reset link for {to_email}: {reset_url}")
             return True
-        except Exception as e:
-            print(f"Error sending email: {e}")
-            return False
+
+        return await _send_email({
+            "from": settings.EMAIL_FROM,
+            "to": [to_email],
+            "subject": "Reset Your Password - Attendance Tracker",
+            "html": _RESET_TPL.substitute(
+                user_name=html.escape(user_name),
+                reset_url=html.escape(reset_url),
+                hours=settings.RESET_TOKEN_EXPIRE_HOURS,
+            ),
+        })
@@ -0,0 +1,50 @@
+"""Public holiday dates held in memory for business-day calculations."""
+import time
+from datetime import date
+from typing import FrozenSet, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.database import async_session
+from app.models.attendance import PublicHoliday
+
+# Holidays only change a few times a year; the periodic reload picks up
+# edits made through other worker processes
+_HOLIDAY_DATES_TTL_SECONDS = 300
+
+_holiday_dates: FrozenSet[date] = frozenset()
+_expires_at = 0.0
+
+
+async def load_holiday_dates(db: AsyncSession) -> FrozenSet[date]:
+    """Reload every public holiday date from the database."""
+    global _holiday_dates, _expires_at
+    result = await db.execute(select(PublicHoliday.date))
+    _holiday_dates = frozenset(result.scalars().all())
+    _expires_at = time.monotonic() + _HOLIDAY_DATES_TTL_SECONDS
+    return _holiday_dates
+
+
+async def get_holiday_dates(db: AsyncSession) -> FrozenSet[date]:
+    """Public holiday dates, reloaded once the in-memory set has expired."""
+    if time.monotonic() >= _expires_at:
+        return await load_holiday_dates(db)
+    return _holiday_dates
+
+
+def invalidate_holiday_dates():
+    """Force a reload on next use - call after holidays are added or removed."""
+    global _expires_at
+    _expires_at = 0.0
+
+
+async def warm_holiday_dates():
+    """Load the holiday set at startup so the first requests skip the query."""
+    async with async_session() as db:
+        await load_holiday_dates(db)
+
+
+def count_weekday_holidays(holidays: Iterable[date], start_date: date, end_date: date) -> int:
+    """Count holidays that fall on a weekday between two dates inclusive."""
+    return sum(1 for h in holidays if start_date <= h <= end_date and h.weekday() < 5)
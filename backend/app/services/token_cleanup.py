@@ -0,0 +1,60 @@
+"""Periodic purge of spent password reset tokens."""
+import asyncio
+import datetime as dt
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import delete, or_
+
+from app.database import async_session
+from app.models.password_reset import PasswordResetToken
+
+PURGE_INTERVAL_SECONDS = 24 * 60 * 60
+# Grace period before expired (never used) tokens are deleted
+EXPIRED_RETENTION = dt.timedelta(days=7)
+
+_purge_task: Optional[asyncio.Task] = None
+
+
+async def purge_stale_reset_tokens(db: AsyncSession) -> int:
+    """Delete used tokens and tokens expired past the retention window."""
+    cutoff = dt.datetime.utcnow() - EXPIRED_RETENTION
+    result = await db.execute(
+        delete(PasswordResetToken).where(
+            or_(
+                PasswordResetToken.used == True,
+                PasswordResetToken.expires_at < cutoff,
+            )
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def _purge_loop():
+    while True:
+        try:
+            async with async_session() as db:
+                await purge_stale_reset_tokens(db)
+        except Exception as e:
+            print(f"Reset token purge failed: {e}")
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+
+
+def start_token_purge():
+    """Start the daily purge in the background (called at app startup)."""
+    global _purge_task
+    if _purge_task is None:
+        _purge_task = asyncio.create_task(_purge_loop())
+
+
+async def stop_token_purge():
+    """Cancel the background purge (called at app shutdown)."""
+    global _purge_task
+    if _purge_task is not None:
+        _purge_task.cancel()
+        try:
+            await _purge_task
+        except asyncio.CancelledError:
+            pass
+        _purge_task = None
@@ -0,0 +1,46 @@
+"""Date helpers shared by routes and services."""
+from datetime import date, timedelta
+
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+class utc_now(FunctionElement):
+    """Current UTC time as a naive timestamp, evaluated by the database.
+
+    Matches the datetime.utcnow() values the app writes elsewhere - plain
+    now() on a naive PostgreSQL column would store session-timezone time.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+@compiles(utc_now)
+def _utc_now_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
+def date_range_filter(column, start: date, end: date) -> tuple:
+    """Half-open (>= start, < end + 1 day) predicates for an inclusive date range.
+
+    Compares the bare column - never wrap it in DATE()/strftime() - so the
+    planner can range-scan the (user_id, date) index.
+    """
+    return column >= start, column < end + timedelta(days=1)
+
+
+def weekdays_between(start: date, end: date) -> int:
+    """Count weekdays (Mon-Fri) between two dates inclusive, in constant time."""
+    if end < start:
+        return 0
+    full_weeks, extra = divmod((end - start).days + 1, 7)
+    first = start.weekday()
+    # Every full week has 5 weekdays; walk at most 6 leftover days
+    return full_weeks * 5 + sum(1 for i in range(extra) if (first + i) % 7 < 5)
@@ -7,15 +7,252 @@ Supports both SQLite (local) and PostgreSQL (Railway).
 Usage:
     python apply_migration.py 001_add_has_seen_intro.sql
     python apply_migration.py 001_add_has_seen_intro.sql --dry-run
+    python apply_migration.py 001_add_has_seen_intro.sql --yes
+    python apply_migration.py --list
 """
 
+import argparse
+import hashlib
+import io
 import sys
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from sqlalchemy import create_engine, text
+import sqlparse
+from sqlalchemy import create_engine, inspect, text
 from app.config import settings
 
-def apply_migration(migration_file: str, dry_run: bool = False):
+STATEMENTS_PER_BATCH = 50
+# Connections used at once for a parallel group (within the engine's pool)
+MAX_PARALLEL_WORKERS = 8
+# Applied migrations, so reruns of an unchanged file are skipped
+LEDGER_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    filename TEXT PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    checksum TEXT NOT NULL
+)
+"""
+# Runs of at least this many plain INSERT rows into one table are sent with COPY
+COPY_MIN_ROWS = 10
+SIMPLE_INSERT_RE = re.compile(
+    r"INSERT\s+INTO\s+([\w.\"]+)\s*\(([^()]*)\)\s*VALUES\s*(.+)", re.IGNORECASE | re.DOTALL
+)
+_ROW_START_RE = re.compile(r"\s*\(")
+_ROW_SEPARATOR_RE = re.compile(r"\s*(,?)\s*")
+_LITERAL_RE = re.compile(
+    r"\s*(?:'((?:[^']|'')*)'|(NULL)|(-?\d+(?:\.\d+)?|TRUE|FALSE))\s*", re.IGNORECASE
+)
+PARALLEL_GROUP_RE = re.compile(r"^--\s*@parallel-group:\s*(\S+)\s*$", re.MULTILINE | re.IGNORECASE)
+
+_engine = None
+
+def get_engine():
+    """Sync engine for the app database, created once and reused."""
+    global _engine
+    if _engine is None:
+        # The app uses async drivers; this script uses their sync counterparts
+        db_url = settings.DATABASE_URL.replace('+asyncpg', '').replace('+aiosqlite', '')
+        if db_url.startswith('sqlite'):
+            _engine = create_engine(db_url)
+        else:
+            # pre_ping/recycle: Railway's proxy drops idle connections
+            _engine = create_engine(
+                db_url,
+                pool_size=10,
+                max_overflow=20,
+                pool_pre_ping=True,
+                pool_recycle=3600,
+            )
+    return _engine
+
+def split_statements(sql_content: str) -> list:
+    """Split a SQL script into statements, without comments or trailing semicolons.
+
+    sqlparse tokenizes the script, so semicolons inside string literals,
+    DO $$ ... $$ blocks and function bodies don't end a statement.
+    """
+    stripped = sqlparse.format(sql_content, strip_comments=True)
+    return [s.rstrip(';').strip() for s in sqlparse.split(stripped) if s.strip()]
+
+def applied_checksum(engine, filename: str):
+    """Checksum the migration was applied with, or None if it hasn't been.
+
+    Read-only - a database without the ledger table has applied nothing.
+    """
+    with engine.connect() as conn:
+        if not inspect(conn).has_table("schema_migrations"):
+            return None
+        return conn.execute(
+            text("SELECT checksum FROM schema_migrations WHERE filename = :filename"),
+            {"filename": filename},
+        ).scalar()
+
+def record_migration(conn, filename: str, checksum: str):
+    """Add the migration to the ledger, creating the ledger on first use."""
+    _execute(conn, LEDGER_DDL)
+    conn.execute(
+        text("INSERT INTO schema_migrations (filename, checksum) VALUES (:filename, :checksum)"),
+        {"filename": filename, "checksum": checksum},
+    )
+
+def plan_migration(sql_content: str) -> list:
+    """Split a script into steps of (parallel group or None, statements).
+
+    A "-- @parallel-group: <name>" line starts a group of independent
+    statements that may run concurrently; "-- @parallel-group: end" (or the
+    next group marker) ends it. Statements outside any group run in order.
+    """
+    steps = []
+    group = None
+    # split() with a capturing group alternates text and group names
+    for i, part in enumerate(PARALLEL_GROUP_RE.split(sql_content)):
+        if i % 2:
+            group = None if part.lower() == "end" else part
+            continue
+        statements = split_statements(part)
+        if statements:
+            steps.append((group, statements))
+    return steps
+
+def _execute(conn, sql: str):
+    # no_parameters: send the SQL as-is, so a literal % isn't read as a placeholder
+    conn.exec_driver_sql(sql, execution_options={"no_parameters": True})
+
+def parse_simple_insert(statement: str):
+    """Split "INSERT INTO t (cols) VALUES (...), ..." into (table, cols, CSV rows).
+
+    Only plain literals (quoted strings, numbers, NULL, TRUE/FALSE) are
+    accepted; anything else (expressions, ON CONFLICT, RETURNING) returns
+    None so the statement runs as written.
+    """
+    match = SIMPLE_INSERT_RE.fullmatch(statement)
+    if not match:
+        return None
+    table, cols, values = match.groups()
+    rows = []
+    pos = 0
+    while True:
+        opened = _ROW_START_RE.match(values, pos)
+        if not opened:
+            return None
+        pos = opened.end()
+        fields = []
+        while True:
+            value = _LITERAL_RE.match(values, pos)
+            if not value:
+                return None
+            fields.append(_csv_field(value))
+            pos = value.end()
+            if values.startswith(",", pos):
+                pos += 1
+            elif values.startswith(")", pos):
+                pos += 1
+                break
+            else:
+                return None
+        rows.append(",".join(fields))
+        separator = _ROW_SEPARATOR_RE.match(values, pos)
+        pos = separator.end()
+        if separator.group(1) != ",":
+            break
+    if pos != len(values):
+        return None
+    return table, " ".join(cols.split()), rows
+
+def _csv_field(value) -> str:
+    # COPY ... CSV reads an unquoted empty field as NULL and "" as an empty string
+    text_value, null, literal = value.groups()
+    if text_value is not None:
+        return '"' + text_value.replace("''", "'").replace('"', '""') + '"'
+    if null is not None:
+        return ""
+    return literal
+
+def _copy_rows(conn, table: str, cols: str, rows: list):
+    """Stream rows into a table with COPY FROM STDIN (one round-trip)."""
+    buffer = io.StringIO("\n".join(rows) + "\n")
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+def _group_inserts(statements: list) -> list:
+    """Pair statements with COPY targets, merging runs of plain INSERTs into one table.
+
+    Returns a list of (statement, None) or ((table, cols), rows) entries.
+    """
+    runs = []  # [target or None, rows, original statements]
+    for statement in statements:
+        parsed = parse_simple_insert(statement)
+        if parsed is None:
+            runs.append([None, None, [statement]])
+            continue
+        table, cols, rows = parsed
+        if runs and runs[-1][0] == (table, cols):
+            runs[-1][1].extend(rows)
+            runs[-1][2].append(statement)
+        else:
+            runs.append([(table, cols), rows, [statement]])
+
+    entries = []
+    for target, rows, originals in runs:
+        # Short runs aren't worth a COPY - keep the original statements
+        if target is None or len(rows) < COPY_MIN_ROWS:
+            entries.extend((statement, None) for statement in originals)
+        else:
+            entries.append((target, rows))
+    return entries
+
+def run_serial(conn, statements: list, progress: list):
+    """Run statements in order on the connection's transaction, one round-trip per batch.
+
+    SQLite's driver only runs one statement per call. On PostgreSQL (psycopg2),
+    runs of plain INSERTs into the same table are loaded with COPY instead.
+    """
+    batch_size = 1 if conn.dialect.name == "sqlite" else STATEMENTS_PER_BATCH
+    use_copy = conn.dialect.driver == "psycopg2"
+    entries = _group_inserts(statements) if use_copy else [(s, None) for s in statements]
+
+    batch = []
+
+    def flush():
+        if batch:
+            _execute(conn, ";\n".join(batch))
+            batch.clear()
+
+    for entry, rows in entries:
+        if rows is not None:
+            table, cols = entry
+            flush()
+            progress.append(f"Copying {len(rows)} row(s) into {table}...")
+            _copy_rows(conn, table, cols, rows)
+            continue
+        progress.append(f"Executing: {entry[:50]}...")
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+def run_parallel(engine, statements: list, progress: list):
+    """Run independent statements concurrently, each on its own connection.
+
+    Autocommit, so statements that can't run in a transaction block
+    (CREATE INDEX CONCURRENTLY) work here.
+    """
+    def run_one(statement: str):
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            _execute(conn, statement)
+
+    for statement in statements:
+        progress.append(f"Executing: {statement[:50]}...")
+    with ThreadPoolExecutor(max_workers=min(len(statements), MAX_PARALLEL_WORKERS)) as pool:
+        # list() re-raises the first failure
+        list(pool.map(run_one, statements))
+
+def apply_migration(migration_file: str, dry_run: bool = False, assume_yes: bool = False):
     """Apply a SQL migration file to the database."""
 
     # Get migration file path
@@ -42,39 +279,76 @@ def apply_migration(migration_file: str, dry_run: bool = False):
         print("🔍 DRY RUN - No changes made to database")
         return True
 
-    # Confirm before applying
-    response = input("Apply this migration? (yes/no): ").strip().lower()
-    if response not in ['yes', 'y']:
-        print("❌ Migration cancelled")
-        return False
-
+    checksum = hashlib.sha256(sql_content.encode()).hexdigest()
     try:
-        # Create engine (handle both asyncpg and psycopg2)
-        db_url = settings.DATABASE_URL
-        if '+asyncpg' in db_url:
-            db_url = db_url.replace('+asyncpg', '')
-
-        engine = create_engine(db_url)
+        applied = applied_checksum(get_engine(), migration_file)
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        return False
+    if applied == checksum:
+        print("✅ Migration already applied - nothing to do")
+        return True
+    if applied is not None:
+        print("❌ Migration was already applied, but the file has changed since. "
+              "Create a new migration instead of editing an applied one.")
+        return False
 
-        # Execute migration
-        with engine.connect() as conn:
-            # Split by semicolons and execute each statement
-            statements = [s.strip() for s in sql_content.split(';') if s.strip() and not s.strip().startswith('--')]
+    # Confirm before applying (skipped with --yes / in CI)
+    if not assume_yes:
+        response = input("Apply this migration? (yes/no): ").strip().lower()
+        if response not in ['yes', 'y']:
+            print("❌ Migration cancelled")
+            return False
 
-            for statement in statements:
-                if statement:
-                    print(f"Executing: {statement[:50]}...")
-                    conn.execute(text(statement))
+    # Progress lines are collected and written once at the end rather than
+    # one stdout write per statement
+    progress = []
+    # Steps already committed - with parallel groups a migration is applied in
+    # several transactions, and a later failure doesn't roll these back
+    committed = []
+    try:
+        engine = get_engine()
+        # SQLite allows one writer at a time, so parallel groups run serially there
+        sqlite = engine.dialect.name == "sqlite"
 
-            conn.commit()
+        steps = plan_migration(sql_content)
+        recorded = False
+        for i, (group, statements) in enumerate(steps):
+            if group is None or sqlite:
+                with engine.begin() as conn:
+                    run_serial(conn, statements, progress)
+                    # The ledger row commits with the final statements
+                    if i == len(steps) - 1:
+                        record_migration(conn, migration_file, checksum)
+                        recorded = True
+                committed.append(f"step {i + 1} ({len(statements)} statement(s))")
+            else:
+                progress.append(f"Parallel group {group}: {len(statements)} statement(s)")
+                # Each statement autocommits, so a failure can leave the rest of the group applied
+                committed.append(f"step {i + 1} (parallel group {group}, possibly in part)")
+                run_parallel(engine, statements, progress)
+                committed[-1] = f"step {i + 1} (parallel group {group})"
+        if not recorded:
+            with engine.begin() as conn:
+                record_migration(conn, migration_file, checksum)
 
+        print("\n".join(progress))
         print("\n✅ Migration applied successfully!")
         return True
 
     except Exception as e:
+        # Show how far it got - the last batch listed is the one that failed
+        print("\n".join(progress))
         print(f"\n❌ Migration failed: {str(e)}")
+        if committed:
+            print("⚠️  Already committed and NOT rolled back: " + ", ".join(committed))
+            print("   Rerunning starts from the top, so those statements must be idempotent (IF NOT EXISTS).")
         return False
 
+def migration_files(migrations_dir: Path) -> list:
+    """Sorted migration file names in the directory."""
+    return sorted(f.name for f in migrations_dir.iterdir() if f.suffix == ".sql")
+
 def list_migrations():
     """List all available migrations."""
     migrations_dir = Path(__file__).parent / "migrations"
@@ -82,32 +356,41 @@ def list_migrations():
         print("No migrations directory found")
         return
 
-    sql_files = sorted(migrations_dir.glob("*.sql"))
+    sql_files = migration_files(migrations_dir)
     if not sql_files:
         print("No migration files found")
         return
 
     print("\n📋 Available migrations:")
     print("="*60)
-    for sql_file in sql_files:
-        print(f"  • {sql_file.name}")
+    for name in sql_files:
+        print(f"  • {name}")
     print("="*60 + "\n")
 
+def parse_args(argv=None):
+    """Build the CLI parser and parse the command line."""
+    parser = argparse.ArgumentParser(
+        description="Apply a SQL migration from the migrations directory.",
+    )
+    parser.add_argument("migration_file", nargs="?", help="migration file name, e.g. 001_add_has_seen_intro.sql")
+    parser.add_argument("--list", action="store_true", help="list all available migrations")
+    parser.add_argument("--dry-run", action="store_true", help="show what would be executed without applying")
+    parser.add_argument("-y", "--yes", action="store_true",
+                        help="apply without asking for confirmation (implied when CI is set)")
+    return parser, parser.parse_args(argv)
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python apply_migration.py <migration_file.sql> [--dry-run]")
-        print("\nOptions:")
-        print("  --list      List all available migrations")
-        print("  --dry-run   Show what would be executed without applying")
-        list_migrations()
-        sys.exit(1)
+    parser, args = parse_args()
 
-    if sys.argv[1] == "--list":
+    if args.list:
         list_migrations()
         sys.exit(0)
 
-    migration_file = sys.argv[1]
-    dry_run = "--dry-run" in sys.argv
+    if not args.migration_file:
+        parser.print_help()
+        list_migrations()
+        sys.exit(1)
 
-    success = apply_migration(migration_file, dry_run)
+    assume_yes = args.yes or os.environ.get("CI", "").lower() in ("1", "true", "yes")
+    success = apply_migration(args.migration_file, args.dry_run, assume_yes)
     sys.exit(0 if success else 1)
@@ -0,0 +1,8 @@
+-- Migration: Drop standalone index on attendance_logs.date
+-- Date: 2026-10-15
+-- Description: Attendance queries always filter by user_id and a date range.
+-- The unique_user_date constraint already maintains a composite (user_id, date)
+-- index that serves those range scans, so the single-column date index only
+-- adds write overhead.
+
+DROP INDEX IF EXISTS ix_attendance_logs_date;
@@ -0,0 +1,22 @@
+-- Migration: Database-side defaults for created_at / updated_at
+-- Date: 2026-10-15
+-- Description: Timestamps are now filled by the database (current UTC time, to
+-- match the naive datetime.utcnow() values written elsewhere - plain now() would
+-- store session-timezone time) instead of per-row Python defaults, and read back
+-- via RETURNING.
+-- SQLite cannot alter column defaults; recreate local SQLite databases instead.
+
+ALTER TABLE users ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE users ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+
+ALTER TABLE subscriptions ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE subscriptions ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+
+ALTER TABLE attendance_logs ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+ALTER TABLE attendance_logs ALTER COLUMN updated_at SET DEFAULT timezone('utc', now());
+
+ALTER TABLE targets ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+
+ALTER TABLE chat_feedback ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
+
+ALTER TABLE password_reset_tokens ALTER COLUMN created_at SET DEFAULT timezone('utc', now());
@@ -0,0 +1,14 @@
+-- Migration: Partial index on unused password reset tokens
+-- Date: 2026-10-15
+-- Description: forgot-password looks up a user's unused tokens to invalidate
+-- them. Indexing only rows with used = false keeps the index small while used
+-- and expired tokens accumulate (the app now purges them daily: used tokens,
+-- and tokens expired for more than 7 days).
+
+CREATE INDEX IF NOT EXISTS ix_password_reset_tokens_unused_user
+    ON password_reset_tokens (user_id)
+    WHERE used = false;
+
+-- One-off cleanup of tokens that the daily purge would remove
+DELETE FROM password_reset_tokens
+WHERE used = true OR expires_at < CURRENT_TIMESTAMP - INTERVAL '7 days';
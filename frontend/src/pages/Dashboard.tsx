@@ -343,9 +343,9 @@ export function DashboardPage() {
 
   const confirmParsedEntries = async () => {
     try {
-      for (const entry of parsedEntries) {
-        await attendanceApi.quickLog(entry.status, entry.date)
-      }
+      await attendanceApi.bulkLog(
+        parsedEntries.map(entry => ({ date: entry.date, status: entry.status }))
+      )
       setParsedEntries([])
       setNlInput('')
       setNlMessage('Entries saved successfully!')
@@ -149,6 +149,11 @@ export const attendanceApi = {
     return response.data
   },
 
+  bulkLog: async (entries: { date: string; status: AttendanceStatus }[]): Promise<AttendanceLog[]> => {
+    const response = await api.post('/attendance/bulk', entries)
+    return response.data
+  },
+
   getSummary: async (startDate: string, endDate: string): Promise<AttendanceSummary> => {
     const response = await api.get(`/attendance/summary?start_date=${startDate}&end_date=${endDate}`)
     return response.data